@@ -0,0 +1,374 @@
+"""
+Open-loop load generator for a local Ticket Tracker instance.
+
+Requests arrive as a Poisson process at the target rate of the current
+stage, independent of how fast the server answers, so a slow server
+builds up a queue instead of quietly receiving less load. Latency is
+measured from each request's scheduled arrival, which includes any
+time it waited for a free connection.
+
+    python loadtest/loadgen.py --url http://localhost:80 --rate 50 --duration 30
+    python loadtest/loadgen.py --stages 30s:20,1m:200,30s:200,15s:0 \\
+        --mix list=20,get=50,search=5,create=12,update=10,delete=3 --output report.json
+
+Each stage ramps the arrival rate linearly from the previous stage's
+target (0 at the start) to its own, so a 0s stage jumps straight to a
+level. Deletes only remove tickets this run created. The report is
+printed (and optionally written) as JSON.
+
+Only the Python standard library is used, so it runs wherever the app
+does.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+DEFAULT_MIX = 'list=20,get=50,search=5,create=12,update=10,delete=3'
+OPERATIONS = ('list', 'get', 'search', 'create', 'update', 'delete')
+STATUSES = ('todo', 'in-progress', 'review', 'completed')
+SEARCH_TERMS = ('login', 'bug', 'report', 'page', 'error', 'user')
+
+
+class ConnectionClosed(ConnectionError):
+    """The server closed the connection before sending a status line."""
+
+
+class HTTPConnection:
+    """A keep-alive HTTP/1.1 connection speaking just enough of the protocol."""
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None):
+        """
+        Send a request and return (status, body bytes).
+
+        Servers close kept-alive connections that sit idle (gunicorn after
+        GUNICORN_KEEPALIVE seconds). If a reused connection turns out to be
+        closed before any status line arrives, the request is sent once
+        more on a new connection.
+        """
+        headers = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}',
+                   'Accept: application/json']
+        if body is not None:
+            body = json.dumps(body).encode()
+            headers += ['Content-Type: application/json', f'Content-Length: {len(body)}']
+        data = ('\r\n'.join(headers) + '\r\n\r\n').encode() + (body or b'')
+        while True:
+            reused = self.writer is not None
+            if not reused:
+                self.reader, self.writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), self.timeout)
+            try:
+                self.writer.write(data)
+                return await asyncio.wait_for(self._read_response(), self.timeout)
+            except ConnectionClosed:
+                self.close()
+                if not reused:
+                    raise
+            except BaseException:
+                self.close()
+                raise
+
+    async def _read_response(self):
+        try:
+            status_line = await self.reader.readline()
+        except ConnectionError:
+            status_line = b''
+        if not status_line:
+            raise ConnectionClosed('Connection closed by server')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if not size:
+                    break
+                chunks.append(chunk[:-2])
+            data = b''.join(chunks)
+        elif 'content-length' in headers:
+            data = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            data = await self.reader.read()
+            headers['connection'] = 'close'
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, data
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+def parse_duration(text):
+    """'90', '90s', '2m' or '1h' in seconds."""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([smh]?)', text.strip())
+    if not match:
+        raise ValueError(f'Invalid duration: {text}')
+    return float(match.group(1)) * {'': 1, 's': 1, 'm': 60, 'h': 3600}[match.group(2)]
+
+
+def parse_stages(text):
+    """'30s:20,1m:200' -> [(30.0, 20.0), (60.0, 200.0)] as (duration, target rate)."""
+    stages = []
+    for part in text.split(','):
+        duration, _, rate = part.partition(':')
+        if not rate:
+            raise ValueError(f'Invalid stage (expected duration:rate): {part}')
+        stages.append((parse_duration(duration), float(rate)))
+    return stages
+
+
+def parse_mix(text):
+    """'get=80,create=20' -> {'get': 80.0, 'create': 20.0}."""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f'Unknown operation {name!r}; expected one of {", ".join(OPERATIONS)}')
+        mix[name] = float(weight)
+    if sum(mix.values()) <= 0:
+        raise ValueError('The mix needs at least one positive weight')
+    return mix
+
+
+def rate_at(stages, elapsed):
+    """Target arrival rate at elapsed seconds, or None after the last stage."""
+    start_rate = 0.0
+    for duration, rate in stages:
+        if elapsed < duration:
+            return start_rate + (rate - start_rate) * elapsed / duration
+        elapsed -= duration
+        start_rate = rate
+    return None
+
+
+def percentiles(values):
+    """p50/p95/p99/max/mean of latencies in seconds, in milliseconds."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(p):
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 3)
+
+    return {'p50': pick(50), 'p95': pick(95), 'p99': pick(99),
+            'max': round(ordered[-1] * 1000, 3), 'mean': round(sum(ordered) / len(ordered) * 1000, 3)}
+
+
+class LoadGenerator:
+    """Sends the mix of requests at the staged rates and collects the results."""
+
+    def __init__(self, url, stages, mix, connections=64, timeout=10.0,
+                 max_outstanding=10000, seed=None):
+        parts = urlsplit(url)
+        if parts.scheme != 'http':
+            raise ValueError('Only http:// URLs are supported')
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.stages = stages
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.timeout = timeout
+        self.max_outstanding = max_outstanding
+        self.rng = random.Random(seed)
+        # Most recently used connection first, so at low rates requests
+        # share a few warm connections instead of cycling through idle
+        # ones the server may have closed
+        self.pool = asyncio.LifoQueue()
+        for _ in range(connections):
+            self.pool.put_nowait(HTTPConnection(self.host, self.port, timeout))
+        self.known_ids = []
+        self.created_ids = []
+        self.results = []           # (stage, operation, status or None, latency, service time)
+        self.errors = Counter()
+        self.dropped = 0
+        self.outstanding = 0
+
+    def stage_of(self, elapsed):
+        for index, (duration, _) in enumerate(self.stages):
+            if elapsed < duration:
+                return index
+            elapsed -= duration
+        return len(self.stages) - 1
+
+    def next_request(self):
+        """Pick an operation from the mix; return (operation, method, path, body)."""
+        operation = self.rng.choices(self.operations, self.weights)[0]
+        if operation in ('get', 'update') and not self.known_ids:
+            operation = 'list'
+        if operation == 'delete' and not self.created_ids:
+            operation = 'create'
+        if operation == 'list':
+            statuses = ','.join(self.rng.sample(STATUSES, self.rng.randint(1, len(STATUSES))))
+            return operation, 'GET', f'/api/tickets?status={statuses}', None
+        if operation == 'get':
+            return operation, 'GET', f'/api/tickets/{self.rng.choice(self.known_ids)}', None
+        if operation == 'search':
+            return operation, 'GET', f'/api/tickets/search?q={self.rng.choice(SEARCH_TERMS)}', None
+        if operation == 'update':
+            return (operation, 'PUT', f'/api/tickets/{self.rng.choice(self.known_ids)}',
+                    {'status': self.rng.choice(STATUSES)})
+        if operation == 'delete':
+            ticket_id = self.created_ids.pop(self.rng.randrange(len(self.created_ids)))
+            self.known_ids.remove(ticket_id)
+            return operation, 'DELETE', f'/api/tickets/{ticket_id}', None
+        return operation, 'POST', '/api/tickets', {
+            'title': f'Load test ticket {self.rng.randrange(10 ** 6)}',
+            'description': 'Created by loadtest/loadgen.py',
+            'due_date': time.strftime('%Y-%m-%d', time.localtime(time.time() + 7 * 86400)),
+        }
+
+    async def prime(self):
+        """Learn some existing ticket IDs to read and update."""
+        connection = await self.pool.get()
+        try:
+            status, body = await connection.request('GET', '/api/tickets?limit=1000')
+            if status == 200:
+                self.known_ids = [ticket['id'] for ticket in json.loads(body)]
+        finally:
+            self.pool.put_nowait(connection)
+
+    async def send(self, stage, scheduled, operation, method, path, body):
+        connection = await self.pool.get()
+        started = time.perf_counter()
+        status = None
+        try:
+            status, data = await connection.request(method, path, body)
+            if operation == 'create' and status == 201:
+                ticket_id = json.loads(data)['id']
+                self.created_ids.append(ticket_id)
+                self.known_ids.append(ticket_id)
+            elif status >= 400:
+                self.errors[f'HTTP {status}'] += 1
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            self.errors[type(e).__name__] += 1
+        finally:
+            self.pool.put_nowait(connection)
+            self.outstanding -= 1
+        finished = time.perf_counter()
+        self.results.append((stage, operation, status, finished - scheduled, finished - started))
+
+    async def run(self):
+        await self.prime()
+        tasks = set()
+        start = time.perf_counter()
+        next_arrival = start
+        while True:
+            elapsed = next_arrival - start
+            rate = rate_at(self.stages, elapsed)
+            if rate is None:
+                break
+            if rate <= 0:
+                # Nothing to send at this point of the ramp; look again shortly
+                next_arrival += 0.01
+                continue
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.outstanding >= self.max_outstanding:
+                self.dropped += 1
+            else:
+                self.outstanding += 1
+                task = asyncio.create_task(self.send(self.stage_of(elapsed), next_arrival,
+                                                     *self.next_request()))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            next_arrival += self.rng.expovariate(rate)
+        sent_for = time.perf_counter() - start
+        if tasks:
+            await asyncio.wait(tasks, timeout=self.timeout)
+        while not self.pool.empty():
+            self.pool.get_nowait().close()
+        return self.report(sent_for)
+
+    def report(self, duration):
+        def summary(results, seconds):
+            failed = sum(1 for _, _, status, _, _ in results if status is None or status >= 400)
+            return {
+                'requests': len(results),
+                'throughput_rps': round(len(results) / seconds, 2) if seconds else 0.0,
+                'errors': failed,
+                'error_rate': round(failed / len(results), 4) if results else 0.0,
+                'latency_ms': percentiles([r[3] for r in results]),
+                'service_ms': percentiles([r[4] for r in results]),
+            }
+
+        report = {
+            'target': f'http://{self.host}:{self.port}',
+            'duration_s': round(duration, 3),
+            'stages': [],
+            **summary(self.results, duration),
+            'dropped': self.dropped,
+            'status_codes': dict(sorted(Counter(str(r[2]) for r in self.results if r[2]).items())),
+            'error_types': dict(self.errors),
+            'operations': {},
+        }
+        for index, (stage_duration, rate) in enumerate(self.stages):
+            if not stage_duration:
+                continue
+            results = [r for r in self.results if r[0] == index]
+            report['stages'].append({'duration_s': stage_duration, 'target_rps': rate,
+                                     **summary(results, stage_duration)})
+        for operation in self.operations:
+            results = [r for r in self.results if r[1] == operation]
+            if results:
+                report['operations'][operation] = summary(results, duration)
+        return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Open-loop load generator for the Ticket Tracker.')
+    parser.add_argument('--url', default='http://localhost:80', help='base URL (default: %(default)s)')
+    parser.add_argument('--rate', type=float, default=20,
+                        help='constant arrival rate in requests/s (default: %(default)s)')
+    parser.add_argument('--duration', default='30s', help='run time at --rate (default: %(default)s)')
+    parser.add_argument('--stages', help='ramp profile as duration:rate,... (overrides --rate/--duration)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='operation weights (default: %(default)s)')
+    parser.add_argument('--connections', type=int, default=64,
+                        help='maximum concurrent connections (default: %(default)s)')
+    parser.add_argument('--max-outstanding', type=int, default=10000,
+                        help='requests waiting or in flight before arrivals are dropped')
+    parser.add_argument('--timeout', type=float, default=10, help='per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, help='random seed for a repeatable request sequence')
+    parser.add_argument('--output', help='also write the JSON report to this file')
+    args = parser.parse_args(argv)
+
+    try:
+        stages = parse_stages(args.stages) if args.stages else [(0, args.rate), (parse_duration(args.duration), args.rate)]
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    generator = LoadGenerator(args.url, stages, mix, args.connections, args.timeout,
+                              args.max_outstanding, args.seed)
+    report = asyncio.run(generator.run())
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+    return 1 if report['requests'] == 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,144 +1,2604 @@
 """
 Simple Ticket Tracker API
-Flask-based REST API for managing tickets stored in a JSON file.
+Flask-based REST API for managing tickets stored in a JSON file or SQLite.
 """
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, g, jsonify, request, send_from_directory
+from flask.json.provider import DefaultJSONProvider
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+import base64
+import bisect
+import cProfile
+import csv
+import functools
+import gzip
+import hashlib
+import hmac
+import io
+import itertools
+import heapq
 import json
+import math
 import os
+import pstats
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
 import uuid
-from datetime import datetime
+import zlib
+from datetime import date, datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional, gzip only
+    brotli = None
 
 app = Flask(__name__, static_folder='.')
 
 DATA_FILE = 'tickets_data.json'
 
 
-def load_tickets():
-    """Load tickets from JSON file."""
-    if not os.path.exists(DATA_FILE):
+def _env_flag(name, default=False):
+    """Read a boolean setting from the environment."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# Journal mode appends one record per mutation to DATA_FILE + '.journal'
+# instead of rewriting the whole data file; a background compactor folds
+# the journal back into DATA_FILE.
+JOURNAL_ENABLED = _env_flag('TICKETS_JOURNAL')
+JOURNAL_COMPACT_RECORDS = int(os.environ.get('TICKETS_JOURNAL_COMPACT_RECORDS', '1000'))
+JOURNAL_COMPACT_INTERVAL = float(os.environ.get('TICKETS_JOURNAL_COMPACT_INTERVAL', '60'))
+
+# Storage engine: 'json' keeps tickets in DATA_FILE (optionally with the
+# journal above), 'sqlite' in an SQLite database at SQLITE_FILE that is
+# seeded from DATA_FILE when first created
+STORAGE_BACKEND = os.environ.get('TICKETS_STORAGE', 'json').strip().lower()
+SQLITE_FILE = os.environ.get('TICKETS_SQLITE_FILE', 'tickets_data.db')
+
+# Group commit: writes from concurrent requests are queued and committed
+# together by one writer thread, optionally waiting GROUP_COMMIT_INTERVAL
+# seconds for more to join. FSYNC_ENABLED flushes every commit to stable
+# storage before it is acknowledged.
+GROUP_COMMIT_ENABLED = _env_flag('TICKETS_GROUP_COMMIT', True)
+GROUP_COMMIT_INTERVAL = float(os.environ.get('TICKETS_GROUP_COMMIT_INTERVAL', '0'))
+FSYNC_ENABLED = _env_flag('TICKETS_FSYNC', True)
+
+# Number of recent changes kept for GET /api/tickets/changes
+CHANGE_LOG_SIZE = int(os.environ.get('TICKETS_CHANGE_LOG_SIZE', '1000'))
+
+# Server-Sent Events on /api/tickets/events: open streams allowed per worker
+# process, seconds between keep-alive comments, and how often a stream
+# checks the data files for changes made by other workers
+SSE_MAX_SUBSCRIBERS = int(os.environ.get('TICKETS_SSE_MAX_SUBSCRIBERS', '100'))
+SSE_HEARTBEAT = float(os.environ.get('TICKETS_SSE_HEARTBEAT', '15'))
+SSE_POLL_INTERVAL = float(os.environ.get('TICKETS_SSE_POLL_INTERVAL', '1'))
+SSE_RETRY_MS = 3000
+
+# Upper bounds (seconds) of the latency histogram buckets served on /metrics
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram:
+    """Latency observations counted into LATENCY_BUCKETS, plus their sum."""
+
+    __slots__ = ('counts', 'sum')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.sum += seconds
+
+    def samples(self):
+        """Yield (le, cumulative count) in exposition order, then ('+Inf', total)."""
+        total = 0
+        for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), self.counts):
+            total += count
+            yield str(bound), total
+
+
+# Metrics of this process; every gunicorn worker keeps its own
+_metrics_lock = threading.Lock()
+_request_counts = Counter()     # (method, route, status) -> requests
+_request_latency = {}           # (method, route) -> Histogram
+_storage_latency = {}           # operation -> Histogram
+_active_requests = {}           # request number -> perf_counter() at start
+_request_numbers = itertools.count()
+
+
+def observe(histograms, key, seconds):
+    """Record a latency in the histogram for key, creating it on first use."""
+    with _metrics_lock:
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+
+def timed(operation):
+    """Decorator recording the duration of each call as a storage metric."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(_storage_latency, operation, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.request_number = next(_request_numbers)
+    with _metrics_lock:
+        _active_requests[g.request_number] = g.request_started
+
+
+@app.after_request
+def record_request(response):
+    """Count the request and record its latency per route."""
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    elapsed = time.perf_counter() - g.get('request_started', time.perf_counter())
+    with _metrics_lock:
+        _request_counts[(request.method, route, response.status_code)] += 1
+        histogram = _request_latency.get((request.method, route))
+        if histogram is None:
+            histogram = _request_latency[(request.method, route)] = Histogram()
+        histogram.observe(elapsed)
+    return response
+
+
+@app.teardown_request
+def finish_request(exc):
+    # Contexts pushed without dispatching a request never started the timer
+    number = g.pop('request_number', None)
+    if number is not None:
+        with _metrics_lock:
+            _active_requests.pop(number, None)
+
+
+# Requests are profiled with cProfile at PROFILE_SAMPLE_RATE (0-1), or on
+# demand when X-Profile-Token matches PROFILE_TOKEN. The /api/profiles
+# endpoints are only served with a PROFILE_TOKEN and require it, since
+# profiles expose source paths and call stacks. Only the newest
+# PROFILE_MAX_FILES profiles are kept in PROFILE_DIR.
+PROFILE_SAMPLE_RATE = float(os.environ.get('TICKETS_PROFILE_SAMPLE_RATE', '0'))
+PROFILE_TOKEN = os.environ.get('TICKETS_PROFILE_TOKEN', '')
+PROFILE_DIR = os.environ.get('TICKETS_PROFILE_DIR', 'profiles')
+PROFILE_MAX_FILES = int(os.environ.get('TICKETS_PROFILE_MAX_FILES', '50'))
+
+# cProfile only sees the thread that enabled it, and one profiler at a
+# time keeps the overhead bounded; concurrent requests are not sampled
+_profile_lock = threading.Lock()
+
+
+def profiling_enabled():
+    return PROFILE_SAMPLE_RATE > 0 or bool(PROFILE_TOKEN)
+
+
+def profile_token_valid():
+    """True if the request carries the configured profiling token."""
+    token = request.headers.get('X-Profile-Token')
+    return bool(PROFILE_TOKEN) and token is not None and hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode())
+
+
+@app.before_request
+def start_profile():
+    if not profiling_enabled() or request.path.startswith('/api/profiles'):
+        return
+    if not (random.random() < PROFILE_SAMPLE_RATE or profile_token_valid()):
+        return
+    if not _profile_lock.acquire(blocking=False):
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler (e.g. a debugger) is active
+        _profile_lock.release()
+        return
+    g.profiler = profiler
+    g.profile_started = time.perf_counter()
+
+
+@app.after_request
+def save_profile(response):
+    """Write the request's profile to PROFILE_DIR and name it in X-Profile-Id."""
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    profiler.disable()
+    _profile_lock.release()
+    elapsed_ms = (time.perf_counter() - g.profile_started) * 1000
+    route = re.sub(r'\W+', '_', request.url_rule.rule if request.url_rule else 'unmatched').strip('_')
+    name = (f"{time.strftime('%Y%m%dT%H%M%S')}-{elapsed_ms:.0f}ms-{request.method}-"
+            f"{route or 'root'}-{uuid.uuid4().hex[:6]}.prof")
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(PROFILE_DIR, name))
+        _prune_profiles()
+    except OSError:
+        app.logger.exception('Could not save profile %s', name)
+        return response
+    response.headers['X-Profile-Id'] = name
+    return response
+
+
+@app.teardown_request
+def stop_profile(exc):
+    # A request that failed before save_profile ran still holds the profiler
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        _profile_lock.release()
+
+
+def _list_profiles():
+    """Profile file names in PROFILE_DIR, oldest first (names start with the time)."""
+    try:
+        return sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith('.prof'))
+    except FileNotFoundError:
+        return []
+
+
+def _prune_profiles():
+    names = _list_profiles()
+    for name in names[:max(0, len(names) - PROFILE_MAX_FILES)]:
+        try:
+            os.unlink(os.path.join(PROFILE_DIR, name))
+        except FileNotFoundError:
+            pass  # Pruned by another worker
+
+
+@timed('load_tickets')
+def load_tickets(path=None):
+    """Load tickets from a JSON file, DATA_FILE by default."""
+    path = path or DATA_FILE
+    if not os.path.exists(path):
         return []
     try:
-        with open(DATA_FILE, 'r') as f:
+        with open(path, 'r') as f:
             return json.load(f)
     except (json.JSONDecodeError, IOError):
         return []
 
 
-def save_tickets(tickets):
-    """Save tickets to JSON file."""
-    with open(DATA_FILE, 'w') as f:
-        json.dump(tickets, f, indent=2)
+@timed('save_tickets')
+def save_tickets(tickets, path=None):
+    """Save tickets to a JSON file, DATA_FILE by default, atomically replacing the previous version."""
+    _write_atomic(path or DATA_FILE, json.dumps(tickets, indent=2, default=_json_default).encode('utf-8'))
+
+
+def _write_temp(path, data):
+    """Write bytes to a temp file next to path and return its name (fsynced unless FSYNC_ENABLED is off)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            if FSYNC_ENABLED:
+                os.fsync(f.fileno())
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+
+def _write_atomic(path, data):
+    """Replace path with data so readers never observe a partial file."""
+    os.replace(_write_temp(path, data), path)
+
+
+@contextmanager
+def _file_lock(path, exclusive=True):
+    """
+    Hold an advisory lock on path for cross-process coordination.
+
+    Writers take the lock exclusively; readers reloading the data files
+    take it shared so they never interleave with a compaction. Without
+    fcntl (Windows) locking is a no-op and the store is only safe for a
+    single process.
+    """
+    if fcntl is None:  # pragma: no cover - Windows
+        yield
+        return
+    with open(path, 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _file_state(path):
+    """Return an identity tuple that changes whenever path is rewritten."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _encode_record(ticket_id, ticket):
+    """Encode a single change as a compact journal line (None deletes)."""
+    if ticket is None:
+        record = {'op': 'del', 'id': ticket_id}
+    else:
+        record = {'op': 'put', 'ticket': ticket}
+    return (json.dumps(record, separators=(',', ':'), default=_json_default) + '\n').encode('utf-8')
+
+
+def _read_journal(path, offset=0):
+    """
+    Read journal records starting at a byte offset.
+
+    Returns the records and the offset just past the last complete line.
+    A torn trailing line (from a crash mid-append) is left unconsumed and
+    corrupt lines are skipped.
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], offset
+    end = data.rfind(b'\n') + 1
+    records = []
+    for line in data[:end].splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records, offset + end
+
+
+def _decode_record(record):
+    """Turn a journal record into a (ticket_id, ticket) change (None deletes)."""
+    if record.get('op') == 'put':
+        return record['ticket']['id'], record['ticket']
+    if record.get('op') == 'del':
+        return record.get('id'), None
+    return None, None
+
+
+# Known ticket fields, in the order they are serialized
+TICKET_FIELDS = ('id', 'title', 'description', 'due_date', 'status', 'created_at', 'updated_at')
+_TICKET_FIELD_SET = frozenset(TICKET_FIELDS)
+# Few distinct values across many tickets, so one shared string each
+_INTERNED_FIELDS = frozenset(('status', 'due_date'))
+
+# Descriptions at least this long are kept zlib-compressed in memory
+DESCRIPTION_COMPRESS_MIN = 200
+
+_MISSING = object()
+
+
+class Ticket:
+    """
+    Compact in-memory ticket record.
+
+    A plain dict per ticket costs a hash table plus its own copy of every
+    value. Tickets use __slots__ instead, share one interned string per
+    status and due date, and keep long descriptions as zlib-compressed
+    UTF-8 that is only decoded when the description is read. Fields
+    outside TICKET_FIELDS go to a side dict; fields a ticket never had
+    stay unset and are left out of to_dict().
+
+    Records are converted from and to dicts at the JSON boundary
+    (from_dict(), to_dict()). get() and item access mirror the dict API
+    for read-only code. Like the dicts they replace, records are never
+    modified once stored: replace() returns an updated copy.
+    """
+
+    __slots__ = ('id', 'title', '_description', 'due_date', 'status',
+                 'created_at', 'updated_at', '_extra')
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a ticket dict (returned as is if already a record)."""
+        if isinstance(data, cls):
+            return data
+        ticket = cls.__new__(cls)
+        ticket._extra = None
+        ticket._set_fields(data)
+        return ticket
+
+    def replace(self, changes):
+        """Return a copy with the field changes applied."""
+        ticket = Ticket.__new__(Ticket)
+        for name in Ticket.__slots__:
+            value = getattr(self, name, _MISSING)
+            if value is not _MISSING:
+                setattr(ticket, name, value)
+        if self._extra:
+            ticket._extra = dict(self._extra)
+        ticket._set_fields(changes)
+        return ticket
+
+    @property
+    def description(self):
+        value = self._description
+        return zlib.decompress(value).decode('utf-8') if type(value) is bytes else value
+
+    def get(self, name, default=None):
+        if name in _TICKET_FIELD_SET:
+            return getattr(self, name, default)
+        return self._extra.get(name, default) if self._extra else default
+
+    def __getitem__(self, name):
+        value = self.get(name, _MISSING)
+        if value is _MISSING:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name):
+        return self.get(name, _MISSING) is not _MISSING
+
+    def __eq__(self, other):
+        if isinstance(other, Ticket):
+            other = other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'Ticket({self.to_dict()!r})'
+
+    def to_dict(self):
+        """Return the ticket as a plain dict for serialization."""
+        data = {}
+        for name in TICKET_FIELDS:
+            value = getattr(self, name, _MISSING)
+            if value is not _MISSING:
+                data[name] = value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def _set_fields(self, data):
+        for name, value in data.items():
+            if name == 'description':
+                self._description = _pack_text(value)
+            elif name in _TICKET_FIELD_SET:
+                if name in _INTERNED_FIELDS and type(value) is str:
+                    value = sys.intern(value)
+                setattr(self, name, value)
+            else:
+                if self._extra is None:
+                    self._extra = {}
+                self._extra[name] = value
+
+
+def _pack_text(value):
+    """Compress long text when that actually saves memory."""
+    if type(value) is str and len(value) >= DESCRIPTION_COMPRESS_MIN:
+        packed = zlib.compress(value.encode('utf-8'))
+        if len(packed) < len(value):
+            return packed
+    return value
+
+
+def _json_default(value):
+    """json.dumps() hook that serializes Ticket records."""
+    if isinstance(value, Ticket):
+        return value.to_dict()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class TicketJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes Ticket records in responses."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, Ticket):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+
+app.json_provider_class = TicketJSONProvider
+app.json = TicketJSONProvider(app)
+
+
+_id_lock = threading.Lock()
+_id_last_ms = 0
+_id_counter = 0
+
+
+def new_ticket_id():
+    """
+    Generate a time-ordered ticket ID (UUIDv7, RFC 9562).
+
+    The first 48 bits are the Unix time in milliseconds and the 12-bit
+    counter keeps IDs generated in the same millisecond in order, so new
+    IDs sort by creation time. The result has the same 36-character form
+    as the uuid4 IDs of existing tickets, which remain valid.
+    """
+    global _id_last_ms, _id_counter
+    with _id_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _id_last_ms:
+            _id_last_ms = ms
+            # Start low in the counter range to leave room for a burst
+            _id_counter = int.from_bytes(os.urandom(2), 'big') & 0x3FF
+        else:
+            _id_counter += 1
+            if _id_counter > 0xFFF:
+                _id_last_ms += 1
+                _id_counter = 0
+        ms, counter = _id_last_ms, _id_counter
+    rand_b = int.from_bytes(os.urandom(8), 'big') & ((1 << 62) - 1)
+    value = (ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand_b
+    return str(uuid.UUID(int=value))
+
+
+def encode_cursor(key):
+    """Encode a natural sort key as an opaque pagination cursor."""
+    raw = json.dumps(list(key), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a pagination cursor; raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError(f'Invalid cursor: {cursor}')
+    if not (isinstance(key, list) and len(key) == 2 and all(isinstance(k, str) for k in key)):
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return tuple(key)
+
+
+def _status_key(ticket):
+    """Status bucket of a ticket; values that are not strings (only possible
+    in hand-edited data) are kept under None so indexing never fails."""
+    status = getattr(ticket, 'status', None)
+    return status if isinstance(status, str) else None
+
+
+def _natural_key(ticket):
+    """Default listing order for query results: creation time, then ID."""
+    return (str(getattr(ticket, 'created_at', None) or ''), ticket.id)
+
+
+# Full-text search: title words count this many times a description word,
+# and a partial word matches at most this many indexed words
+SEARCH_TITLE_WEIGHT = 3
+SEARCH_MAX_EXPANSIONS = 50
+SEARCH_MIN_PREFIX = 2
+_WORD_RE = re.compile(r'\w+')
+
+
+def _tokenize(text):
+    """Split text into lowercase words."""
+    return _WORD_RE.findall(str(text or '').lower())
+
+
+def _text_weights(ticket):
+    """Map each word of a ticket's title and description to its weight."""
+    weights = Counter(_tokenize(getattr(ticket, 'description', None)))
+    weights.update(_tokenize(getattr(ticket, 'title', None)) * SEARCH_TITLE_WEIGHT)
+    return weights
+
+
+def _sorted_keys(ticket):
+    """
+    A ticket's entries in the store's sorted indexes: (_by_due, _open_due,
+    _ordered), with None for _open_due if it is completed or has no due date.
+    """
+    if ticket is None:
+        return None, None, None
+    due = str(getattr(ticket, 'due_date', None) or '')
+    open_due = due if due and _status_key(ticket) != 'completed' else None
+    return (due, ticket.id), open_due, _natural_key(ticket)
+
+
+def _remove_sorted(items, key):
+    """Remove key from a sorted list if present."""
+    i = bisect.bisect_left(items, key)
+    if i < len(items) and items[i] == key:
+        del items[i]
+
+
+def _ticket_filter(statuses=None, due_from=None, due_to=None, created_from=None, created_to=None):
+    """Build a predicate implementing the list filters."""
+    wanted = set(statuses) if statuses else None
+
+    def matches(ticket):
+        return ((wanted is None or _status_key(ticket) in wanted)
+                and _in_range(getattr(ticket, 'due_date', None), due_from, due_to)
+                and _in_range(getattr(ticket, 'created_at', None), created_from, created_to))
+    return matches
+
+
+def _in_range(value, low, high):
+    """
+    Check a date/datetime string against optional inclusive bounds.
+
+    Bounds compare against the value truncated to their own length, so a
+    date bound like '2026-01-31' includes every time on that day.
+    """
+    value = str(value or '')
+    if low is not None and value[:len(low)] < low:
+        return False
+    if high is not None and value[:len(high)] > high:
+        return False
+    return True
+
+
+class StorageBackend(ABC):
+    """
+    Persistence interface underneath TicketStore.
+
+    The store keeps every ticket in memory and calls its backend to load
+    the collection, to persist changes before it applies them, and to
+    catch up with changes other processes made.
+    Mutations run inside exclusive(), which serializes writers across
+    processes; load() and poll() run inside shared() or exclusive().
+    """
+
+    # True if compact() does anything; the store then runs a compactor thread
+    compacts = False
+
+    def changed(self):
+        """Return True if another process may have written since load or poll."""
+        return False
+
+    @contextmanager
+    def shared(self):
+        """Section in which the stored collection can be read consistently."""
+        yield
+
+    @contextmanager
+    def exclusive(self):
+        """Section for read-modify-write cycles, exclusive across processes."""
+        yield
+
+    @abstractmethod
+    def load(self):
+        """Return all stored tickets in insertion order."""
+
+    def poll(self):
+        """
+        Return (ticket_id, ticket) changes written by others since the last
+        load or poll (None deletes), or None if a full load is needed.
+        """
+        return None
+
+    @abstractmethod
+    def write(self, changes, tickets):
+        """
+        Durably store (ticket_id, ticket) changes (None deletes).
+
+        ``tickets`` is the in-memory id map before the changes, for
+        backends that rewrite the whole collection.
+        """
+
+    def needs_compaction(self):
+        return False
+
+    def files(self):
+        """Paths of the files holding the stored tickets, for /metrics."""
+        return ()
+
+    def compact(self, snapshot, section):
+        """
+        Rewrite storage in a more compact form; return True if it did.
+
+        ``snapshot`` returns the current tickets and must be called inside
+        ``section``, the store's exclusive write section.
+        """
+        return False
+
+    def close(self):
+        pass
+
+
+class JsonFileBackend(StorageBackend):
+    """
+    Tickets in a JSON data file, optionally with an append-only journal.
+
+    By default every write rewrites the data file with save_tickets(). In
+    journal mode each write appends one compact record per change to
+    ``<path>.journal`` instead; loading replays snapshot + journal, and
+    compact() folds the journal back into a snapshot written atomically.
+
+    Processes sharing the files take an flock on ``<path>.lock``. Changes
+    by others are detected from the identity (inode, mtime, size) of the
+    data files, so an unchanged store costs a stat per file; a journal
+    that only grew is replayed from the last known offset.
+    """
+
+    def __init__(self, path, journal=False):
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.lock_path = path + '.lock'
+        self.journal = journal
+        self.compacts = journal
+        self._seen = None
+        self._journal_size = 0
+        self._journal_records = 0
+
+    def changed(self):
+        return self._disk_state() != self._seen
+
+    def shared(self):
+        return _file_lock(self.lock_path, exclusive=False)
+
+    @contextmanager
+    def exclusive(self):
+        with _file_lock(self.lock_path):
+            try:
+                yield
+            finally:
+                self._seen = self._disk_state()
+
+    def load(self):
+        state = self._disk_state()
+        tickets = {t['id']: t for t in load_tickets(self.path)}
+        self._journal_size = self._journal_records = 0
+        if self.journal:
+            records, self._journal_size = _read_journal(self.journal_path)
+            for record in records:
+                ticket_id, ticket = _decode_record(record)
+                if ticket is not None:
+                    tickets[ticket_id] = ticket
+                elif ticket_id is not None:
+                    tickets.pop(ticket_id, None)
+            self._journal_records = len(records)
+        self._seen = state
+        return list(tickets.values())
+
+    def poll(self):
+        data_state, journal_state = self._disk_state()
+        seen = self._seen
+        if not (self.journal and seen is not None and data_state == seen[0]
+                and journal_state is not None
+                and (seen[1] is None or journal_state[0] == seen[1][0])
+                and journal_state[2] >= self._journal_size):
+            return None
+        # Same snapshot and journal file, which only grew: replay the tail
+        records, self._journal_size = _read_journal(self.journal_path, self._journal_size)
+        self._journal_records += len(records)
+        self._seen = self._disk_state()
+        changes = (_decode_record(record) for record in records)
+        return [(ticket_id, ticket) for ticket_id, ticket in changes if ticket_id is not None]
+
+    def write(self, changes, tickets):
+        if self.journal:
+            data = b''.join(_encode_record(ticket_id, ticket) for ticket_id, ticket in changes)
+            try:
+                with open(self.journal_path, 'ab') as f:
+                    f.write(data)
+                    if FSYNC_ENABLED:
+                        f.flush()
+                        os.fsync(f.fileno())
+            except OSError:
+                # Drop a partial line so the next record starts cleanly
+                if os.path.exists(self.journal_path):
+                    os.truncate(self.journal_path, self._journal_size)
+                raise
+            self._journal_size += len(data)
+            self._journal_records += len(changes)
+            return
+        # Full rewrite of the collection as it will look after the changes
+        staged = dict(changes)
+        rows = [staged.get(t.id, t) for t in tickets.values()]
+        rows = [t for t in rows if t is not None]
+        rows.extend(t for ticket_id, t in staged.items()
+                    if t is not None and ticket_id not in tickets)
+        save_tickets(rows, self.path)
+
+    def needs_compaction(self):
+        return self.journal and self._journal_records >= JOURNAL_COMPACT_RECORDS
+
+    def files(self):
+        return (self.path, self.journal_path) if self.journal else (self.path,)
+
+    def compact(self, snapshot, section):
+        """
+        Fold the journal into a fresh snapshot of the data file.
+
+        The snapshot is serialized without holding any lock; only the
+        rename and the trimming of records that were appended meanwhile
+        happen under them. If another process compacted in between, this
+        attempt is abandoned.
+        """
+        if not self.journal:
+            return False
+        with section():
+            if not self._journal_records:
+                return False
+            rows = snapshot()
+            folded_size = self._journal_size
+            seen = self._seen
+        tmp_path = _write_temp(self.path, json.dumps(rows, indent=2, default=_json_default).encode('utf-8'))
+        try:
+            with section():
+                data_state, journal_state = self._seen
+                if data_state != seen[0] or (journal_state or ())[:1] != (seen[1] or ())[:1]:
+                    return False
+                os.replace(tmp_path, self.path)
+                # Replaying a record already in the snapshot is harmless,
+                # so a crash before the journal is trimmed loses nothing
+                with open(self.journal_path, 'rb') as f:
+                    f.seek(folded_size)
+                    tail = f.read()
+                _write_atomic(self.journal_path, tail)
+                self._journal_size = len(tail)
+                self._journal_records = tail.count(b'\n')
+            return True
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def _disk_state(self):
+        journal_state = _file_state(self.journal_path) if self.journal else None
+        return (_file_state(self.path), journal_state)
+
+
+_SQLITE_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS tickets ('
+    ' id TEXT PRIMARY KEY, status TEXT, due_date TEXT,'
+    ' rev INTEGER NOT NULL, data TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS tickets_status ON tickets (status)',
+    'CREATE INDEX IF NOT EXISTS tickets_due_date ON tickets (due_date)',
+    'CREATE INDEX IF NOT EXISTS tickets_rev ON tickets (rev)',
+    'CREATE TABLE IF NOT EXISTS tombstones (id TEXT PRIMARY KEY, rev INTEGER NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS tombstones_rev ON tombstones (rev)',
+    'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)',
+)
+
+# Deletions are remembered for this many revisions so other processes can
+# catch up incrementally; a process further behind reloads everything
+SQLITE_TOMBSTONE_REVISIONS = 10000
+
+
+class SqliteBackend(StorageBackend):
+    """
+    Tickets in an SQLite database in WAL mode.
+
+    Each ticket is a row holding its JSON plus the status and due_date
+    columns, which are indexed; id is the primary key. Upserts keep the
+    rowid, so rowid order is insertion order. WAL lets other processes
+    read while one commits, and writers serialize on SQLite's write lock
+    (BEGIN IMMEDIATE) instead of a lock file.
+
+    Every commit bumps a revision counter in the meta table and stamps the
+    rows it wrote; deletions leave a tombstone. Other processes notice
+    commits through PRAGMA data_version and fetch only the rows and
+    tombstones newer than the revision they last saw.
+
+    A new database is seeded from the JSON data file at json_path.
+    """
+
+    def __init__(self, path, json_path=None):
+        self.path = path
+        self.json_path = json_path
+        self._seen_rev = None
+        self._data_version = None
+        self._db_lock = threading.RLock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(f"PRAGMA synchronous={'FULL' if FSYNC_ENABLED else 'OFF'}")
+        with self._transaction('IMMEDIATE'):
+            for statement in _SQLITE_SCHEMA:
+                self._conn.execute(statement)
+            if self._meta('rev') is None:
+                self._migrate()
+
+    def changed(self):
+        with self._db_lock:
+            return self._conn is not None and self._get_data_version() != self._data_version
+
+    def shared(self):
+        return self._transaction('DEFERRED')
+
+    def exclusive(self):
+        return self._transaction('IMMEDIATE')
+
+    def load(self):
+        with self._db_lock:
+            # Recorded before reading, so a commit in between is seen again
+            self._data_version = self._get_data_version()
+            self._seen_rev = self._meta('rev')
+            rows = self._conn.execute('SELECT data FROM tickets ORDER BY rowid')
+            return [json.loads(data) for data, in rows]
+
+    def poll(self):
+        with self._db_lock:
+            self._data_version = self._get_data_version()
+            if self._seen_rev is None or self._meta('pruned_rev') > self._seen_rev:
+                return None
+            rev = self._meta('rev')
+            changes = [(row_rev, ticket_id, json.loads(data)) for row_rev, ticket_id, data
+                       in self._conn.execute('SELECT rev, id, data FROM tickets WHERE rev > ?',
+                                             (self._seen_rev,))]
+            changes.extend((row_rev, ticket_id, None) for row_rev, ticket_id
+                           in self._conn.execute('SELECT rev, id FROM tombstones WHERE rev > ?',
+                                                 (self._seen_rev,)))
+            changes.sort(key=lambda change: change[0])
+            self._seen_rev = rev
+            return [(ticket_id, ticket) for _, ticket_id, ticket in changes]
+
+    def write(self, changes, tickets):
+        with self._db_lock:
+            rev = self._meta('rev') + 1
+            self._store_changes(changes, rev)
+            if rev % 1000 == 0:
+                self._conn.execute('DELETE FROM tombstones WHERE rev <= ?',
+                                   (rev - SQLITE_TOMBSTONE_REVISIONS,))
+                self._set_meta('pruned_rev', max(rev - SQLITE_TOMBSTONE_REVISIONS, 0))
+            # Commit here so memory is only updated once the change is durable
+            self._conn.execute('COMMIT')
+            self._seen_rev = rev
+
+    def files(self):
+        return (self.path, self.path + '-wal')
+
+    def close(self):
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @contextmanager
+    def _transaction(self, mode):
+        with self._db_lock:
+            self._conn.execute(f'BEGIN {mode}')
+            try:
+                yield
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.execute('ROLLBACK')
+                raise
+            if self._conn.in_transaction:
+                self._conn.execute('COMMIT')
+
+    def _migrate(self):
+        """Initialize a new database, importing the JSON data file if any."""
+        self._set_meta('rev', 0)
+        self._set_meta('pruned_rev', 0)
+        tickets = load_tickets(self.json_path) if self.json_path else []
+        if tickets:
+            self._store_changes([(t['id'], t) for t in tickets], 1)
+            self._set_meta('rev', 1)
+            app.logger.info('Imported %d tickets from %s into %s',
+                            len(tickets), self.json_path, self.path)
+
+    def _store_changes(self, changes, rev):
+        execute = self._conn.execute
+        for ticket_id, ticket in changes:
+            if ticket is None:
+                execute('DELETE FROM tickets WHERE id = ?', (ticket_id,))
+                execute('INSERT OR REPLACE INTO tombstones (id, rev) VALUES (?, ?)', (ticket_id, rev))
+                continue
+            execute('INSERT INTO tickets (id, status, due_date, rev, data) VALUES (?, ?, ?, ?, ?)'
+                    ' ON CONFLICT (id) DO UPDATE SET status = excluded.status,'
+                    ' due_date = excluded.due_date, rev = excluded.rev, data = excluded.data',
+                    (ticket_id, ticket.get('status'), ticket.get('due_date'), rev,
+                     json.dumps(ticket, separators=(',', ':'), default=_json_default)))
+            execute('DELETE FROM tombstones WHERE id = ?', (ticket_id,))
+        self._set_meta('rev', rev)
+
+    def _get_data_version(self):
+        return self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def _meta(self, key):
+        row = self._conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _set_meta(self, key, value):
+        self._conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+
+def create_backend():
+    """Build the storage backend selected by STORAGE_BACKEND."""
+    if STORAGE_BACKEND == 'sqlite':
+        return SqliteBackend(SQLITE_FILE, json_path=DATA_FILE)
+    if STORAGE_BACKEND != 'json':
+        raise ValueError(f'Unknown TICKETS_STORAGE backend: {STORAGE_BACKEND!r}')
+    return JsonFileBackend(DATA_FILE, journal=JOURNAL_ENABLED)
+
+
+class TicketStore:
+    """
+    Process-resident ticket collection.
+
+    Storage is read once and all reads are served from memory. Tickets are
+    kept as compact Ticket records in a dict keyed by ID, which gives O(1)
+    lookup, update and delete while preserving insertion order for listing.
+    Mutations are persisted before they are applied in memory, so a failed
+    write leaves the store unchanged. Records are never modified in place
+    once stored; updates replace them, so callers can safely serialize
+    what they get back.
+
+    Persistence is delegated to a StorageBackend: a JSON data file by
+    default (see JsonFileBackend) or SQLite (see SqliteBackend). Several
+    worker processes may share the same storage. Mutations run in the
+    backend's exclusive section and first catch up with whatever other
+    workers wrote, so read-modify-write cycles never lose updates. Reads
+    ask the backend whether anything changed, which is cheap when nothing
+    did, and apply other workers' changes incrementally where it can.
+
+    ``version`` increases by one for every change applied in memory,
+    whether made here or picked up from disk, and is exposed as ``etag``.
+    A bounded log of recent changes lets clients catch up from a version
+    with changes_since(); a full reload from disk cannot say what changed,
+    so it resets the log and older versions require a resync.
+    """
+
+    def __init__(self, path=None, journal=False, backend=None, group_commit=False):
+        self.backend = backend if backend is not None else JsonFileBackend(path, journal=journal)
+        self.group_commit = group_commit
+        self._tickets = {}
+        self._by_status = {}
+        self._by_due = []
+        self._ordered = []
+        # Sorted due dates of tickets that are not completed, for stats()
+        self._open_due = []
+        # Inverted index for search(): word -> {ticket_id: weight}, plus the
+        # sorted vocabulary for prefix lookups
+        self._postings = {}
+        self._vocab = []
+        # _lock guards the in-memory state and is only held briefly; the
+        # durable write runs under _write_lock and the backend's exclusive
+        # section, so readers are not held up by it
+        self._lock = threading.RLock()
+        self._write_lock = threading.RLock()
+        self._write_in_progress = False
+        self._compact_lock = threading.Lock()
+        self._compact_wanted = threading.Event()
+        self._closed = threading.Event()
+        self._compactor = None
+        # Group commit: (operations, future) pairs waiting for the writer thread
+        self._queue = deque()
+        self._queue_ready = threading.Condition(threading.Lock())
+        self._writer = None
+        # For health(): when the writer thread's running commit started,
+        # including waits for locks (monotonic), and the wall-clock times of
+        # the last persist that succeeded or failed
+        self._writing_since = None
+        self.last_persist = None
+        self.last_persist_error = None
+        # Versions are only comparable within one store instance; the epoch
+        # keeps ETags from different processes or restarts from colliding
+        self.epoch = os.urandom(4).hex()
+        self.version = 0
+        # (version, ticket_id, ticket or None) for the most recent changes;
+        # versions at or below _log_floor are no longer covered
+        self._changes = deque()
+        self._log_floor = 0
+        self._changed = threading.Condition(self._lock)
+
+    def __len__(self):
+        return len(self._tickets)
+
+    @property
+    def etag(self):
+        """Entity tag identifying the current contents of the store."""
+        return f'{self.epoch}-{self.version}'
+
+    def load(self):
+        """(Re)load all tickets from the backend."""
+        with self.backend.shared(), self._lock:
+            self._reload()
+        if self.backend.compacts:
+            self._start_compactor()
+
+    def refresh(self):
+        """
+        Catch up with changes made by other processes.
+
+        Costs one backend change check when nothing changed. Returns True
+        if anything was re-read. Skipped while this store is writing: the
+        writer has caught up with storage itself and applies its own
+        changes once they are durable.
+        """
+        if self._write_in_progress or not self.backend.changed():
+            return False
+        with self.backend.shared(), self._lock:
+            return self._sync()
+
+    def close(self):
+        """Commit queued writes and stop background work; the store stays readable."""
+        self._closed.set()
+        self._compact_wanted.set()
+        with self._queue_ready:
+            self._queue_ready.notify()
+        if self._writer is not None:
+            self._writer.join(timeout=30)
+        if self._compactor is not None:
+            self._compactor.join(timeout=5)
+        self.backend.close()
+
+    def health(self):
+        """
+        Writer state for the health endpoints, without taking the store lock.
+
+        Reports the number of writes waiting for the writer thread, how long
+        the oldest has waited and the running commit has taken (seconds),
+        and when persisting last succeeded or failed.
+        """
+        now = time.monotonic()
+        with self._queue_ready:
+            depth = len(self._queue)
+            oldest = self._queue[0][2] if self._queue else None
+        writing_since = self._writing_since
+        error = self.last_persist_error
+        return {
+            'queue_depth': depth,
+            'oldest_queued_s': round(now - oldest, 3) if oldest is not None else 0.0,
+            'commit_running_s': round(now - writing_since, 3) if writing_since is not None else 0.0,
+            'last_persist': _iso_time(self.last_persist),
+            'last_persist_error': {'at': _iso_time(error[0]), 'error': error[1]} if error else None,
+        }
+
+    def all(self):
+        """Return a snapshot list of all tickets in insertion order."""
+        self.refresh()
+        with self._lock:
+            return list(self._tickets.values())
+
+    def get(self, ticket_id):
+        """Return the ticket with the given ID, or None."""
+        self.refresh()
+        return self._tickets.get(ticket_id)
+
+    def query(self, statuses=None, due_from=None, due_to=None,
+              created_from=None, created_to=None, sort=None, descending=False):
+        """
+        Return tickets matching the given filters.
+
+        Candidates come from whichever index is narrower: the per-status
+        buckets or a range of the due-date index. Remaining filters are
+        checked per candidate. Results are ordered by ``sort`` (a ticket
+        field) or by creation time when no sort is given.
+        """
+        self.refresh()
+        matches = _ticket_filter(statuses, due_from, due_to, created_from, created_to)
+        natural = sort in (None, 'created_at')
+        with self._lock:
+            candidates = None
+            if statuses:
+                buckets = [self._by_status.get(status, {}) for status in set(statuses)]
+                candidates = [ticket_id for bucket in buckets for ticket_id in bucket]
+            if due_from is not None or due_to is not None:
+                lo = 0 if due_from is None else bisect.bisect_left(self._by_due, (due_from,))
+                # '\uffff' sorts after any ID, so every entry on due_to is included
+                hi = (len(self._by_due) if due_to is None
+                      else bisect.bisect_right(self._by_due, (due_to + '\uffff',)))
+                if candidates is None or hi - lo < len(candidates):
+                    candidates = [ticket_id for _, ticket_id in self._by_due[lo:hi]]
+            if candidates is None and natural:
+                # The ordered index is already in natural order
+                ids = (ticket_id for _, ticket_id in self._ordered)
+                results = [t for t in map(self._tickets.__getitem__, ids) if matches(t)]
+                if descending:
+                    results.reverse()
+                return results
+            if candidates is None:
+                tickets = list(self._tickets.values())
+            else:
+                tickets = [self._tickets[ticket_id] for ticket_id in candidates]
+
+        results = [t for t in tickets if matches(t)]
+        if natural:
+            results.sort(key=_natural_key, reverse=descending)
+        else:
+            results.sort(key=lambda t: (str(t.get(sort) or ''), _natural_key(t)), reverse=descending)
+        return results
+
+    def page(self, limit, after=None, descending=False, **filters):
+        """
+        Return up to ``limit`` tickets in creation order after a keyset cursor.
+
+        ``after`` is the natural key of the last ticket on the previous
+        page. Tickets are read from the ordered index starting just past
+        it, so deep pages cost the same as the first. Returns
+        (tickets, next_key) where next_key is None on the last page.
+        """
+        self.refresh()
+        matches = _ticket_filter(**filters)
+        with self._lock:
+            ordered = self._ordered
+            if descending:
+                start = len(ordered) if after is None else bisect.bisect_left(ordered, after)
+                positions = range(start - 1, -1, -1)
+            else:
+                start = 0 if after is None else bisect.bisect_right(ordered, after)
+                positions = range(start, len(ordered))
+            tickets = []
+            for i in positions:
+                ticket = self._tickets[ordered[i][1]]
+                if matches(ticket):
+                    if len(tickets) == limit:
+                        return tickets, _natural_key(tickets[-1])
+                    tickets.append(ticket)
+            return tickets, None
+
+    def stats(self, today=None):
+        """
+        Return ticket counts for the board header.
+
+        Per-status counts are the sizes of the status buckets. Overdue
+        (due before today) and due-this-week (today or the next six days)
+        counts cover tickets that are not completed and are two bisections
+        of their sorted due dates, so nothing is scanned.
+        """
+        self.refresh()
+        today = today or date.today()
+        start = today.isoformat()
+        end = (today + timedelta(days=7)).isoformat()
+        with self._lock:
+            overdue = bisect.bisect_left(self._open_due, start)
+            return {
+                'version': self.etag,
+                'total': len(self._tickets),
+                'by_status': {status: len(bucket) for status, bucket in self._by_status.items()
+                              if status is not None},
+                'overdue': overdue,
+                'due_this_week': bisect.bisect_left(self._open_due, end) - overdue,
+            }
+
+    def search(self, text, limit=20):
+        """
+        Return up to ``limit`` tickets containing every word of text, best first.
+
+        Words of two or more characters also match indexed words they are
+        a prefix of (up to SEARCH_MAX_EXPANSIONS). A ticket scores the sum
+        over matched words of weight times inverse document frequency,
+        where weight counts occurrences, title ones SEARCH_TITLE_WEIGHT
+        times.
+
+        Words are intersected rarest first, and each later word only
+        probes the tickets still in the running, so selective queries
+        touch few postings however large the store is.
+        """
+        terms = list(dict.fromkeys(_tokenize(text)))
+        if not terms:
+            return []
+        self.refresh()
+        with self._lock:
+            total = len(self._tickets)
+            expanded = []
+            for term in terms:
+                tokens = self._expand(term)
+                if not tokens:
+                    return []
+                expanded.append((sum(len(self._postings[token]) for token in tokens), tokens))
+            expanded.sort(key=lambda item: item[0])
+            matches = None
+            for _, tokens in expanded:
+                scores = {}
+                for token in tokens:
+                    postings = self._postings[token]
+                    idf = math.log(1 + total / len(postings))
+                    if matches is not None and len(matches) < len(postings):
+                        hits = ((ticket_id, postings.get(ticket_id)) for ticket_id in matches)
+                        hits = [(ticket_id, weight) for ticket_id, weight in hits if weight]
+                    elif matches is not None:
+                        hits = [(ticket_id, weight) for ticket_id, weight in postings.items()
+                                if ticket_id in matches]
+                    else:
+                        hits = postings.items()
+                    for ticket_id, weight in hits:
+                        scores[ticket_id] = scores.get(ticket_id, 0) + weight * idf
+                if matches is not None:
+                    scores = {ticket_id: score + matches[ticket_id] for ticket_id, score in scores.items()}
+                if not scores:
+                    return []
+                matches = scores
+            best = heapq.nlargest(limit, matches.items(), key=lambda item: item[1])
+            return [self._tickets[ticket_id] for ticket_id, _ in best]
+
+    def changes_since(self, version):
+        """
+        Return (etag, changes) for the changes applied after version.
+
+        Only the latest change per ticket is returned, as (ticket_id, ticket)
+        pairs in version order, with ticket None for deletions. changes is
+        None if version is no longer covered and a resync is needed.
+        """
+        self.refresh()
+        with self._lock:
+            etag = self.etag
+            if version < self._log_floor or version > self.version:
+                return etag, None
+            latest = {}
+            for change_version, ticket_id, ticket in reversed(self._changes):
+                if change_version <= version:
+                    break
+                latest.setdefault(ticket_id, (change_version, ticket))
+        return etag, [(ticket_id, ticket) for ticket_id, (_, ticket)
+                      in sorted(latest.items(), key=lambda item: item[1][0])]
+
+    def wait_for_change(self, version, timeout):
+        """Block until the in-memory version moves past version or timeout."""
+        with self._changed:
+            return self._changed.wait_for(lambda: self.version != version, timeout)
+
+    def add(self, ticket):
+        """Persist and store a new ticket; return it as a Ticket record."""
+        ticket = Ticket.from_dict(ticket)
+        return self._submit([('add', ticket.id, ticket)])[0]
+
+    def update(self, ticket_id, changes):
+        """Apply field changes to a ticket; return the new ticket or None."""
+        return self._submit([('update', ticket_id, changes)])[0]
+
+    def delete(self, ticket_id):
+        """Remove a ticket; return the deleted ticket or None."""
+        return self._submit([('delete', ticket_id, None)])[0]
+
+    def apply_batch(self, operations):
+        """
+        Apply many operations with a single write to disk.
+
+        Each operation is ('add', ticket_id, ticket), ('update', ticket_id,
+        changes) or ('delete', ticket_id, None), evaluated in order so later
+        operations see earlier ones. Returns one result per operation: the
+        added, updated or deleted ticket, or None if the ticket was not
+        found. Nothing is applied if the write fails.
+        """
+        return self._submit([(kind, ticket_id, Ticket.from_dict(payload) if kind == 'add' else payload)
+                             for kind, ticket_id, payload in operations])
+
+    @timed('compact')
+    def compact(self):
+        """
+        Let the backend rewrite its storage compactly, e.g. fold the JSON
+        journal into a new snapshot. Returns False if nothing was compacted.
+        """
+        if not self.backend.compacts or not self._compact_lock.acquire(blocking=False):
+            return False
+        try:
+            return self.backend.compact(self._snapshot, self._writing)
+        finally:
+            self._compact_lock.release()
+
+    @contextmanager
+    def _writing(self):
+        """
+        Exclusive section for mutations, up to date with other processes.
+
+        The store lock is not held inside; take it to read or change memory.
+        """
+        with self._write_lock:
+            self._write_in_progress = True
+            try:
+                with self.backend.exclusive():
+                    with self._lock:
+                        self._sync()
+                    yield
+            finally:
+                self._write_in_progress = False
+
+    def _snapshot(self):
+        with self._lock:
+            return list(self._tickets.values())
+
+    def _sync(self):
+        """Bring memory in line with storage; caller is in a backend section."""
+        if not self.backend.changed():
+            return False
+        changes = self.backend.poll()
+        if changes is None:
+            self._reload()
+            return True
+        for ticket_id, ticket in changes:
+            self._apply(ticket_id, None if ticket is None else Ticket.from_dict(ticket))
+        return True
+
+    @timed('reload')
+    def _reload(self):
+        tickets = {t['id']: Ticket.from_dict(t) for t in self.backend.load()}
+        self._tickets = tickets
+        self._by_status = {}
+        self._by_due = []
+        self._ordered = []
+        self._open_due = []
+        self._postings = {}
+        self._vocab = []
+        for ticket in tickets.values():
+            self._index(ticket)
+        self.version += 1
+        self._changes.clear()
+        self._log_floor = self.version
+        self._changed.notify_all()
+
+    def _submit(self, operations):
+        """
+        Run operations and return their results once they are on disk.
+
+        With group commit the operations are queued for the writer thread,
+        which commits everything queued meanwhile together; otherwise they
+        are committed by the calling thread.
+        """
+        if not self.group_commit:
+            return self._commit_operations(operations)
+        future = Future()
+        with self._queue_ready:
+            if self._closed.is_set():
+                future = None
+            else:
+                self._queue.append((operations, future, time.monotonic()))
+            self._queue_ready.notify()
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop,
+                                                name='ticket-store-writer', daemon=True)
+                self._writer.start()
+        if future is None:
+            return self._commit_operations(operations)
+        return future.result()
+
+    def _write_loop(self):
+        """Commit queued operations in groups until the store is closed."""
+        while True:
+            with self._queue_ready:
+                self._queue_ready.wait_for(lambda: self._queue or self._closed.is_set())
+                if not self._queue:
+                    return
+            if GROUP_COMMIT_INTERVAL > 0:
+                # Let more writers join this commit
+                self._closed.wait(GROUP_COMMIT_INTERVAL)
+            with self._queue_ready:
+                group = list(self._queue)
+                self._queue.clear()
+            operations = [operation for ops, _, _ in group for operation in ops]
+            self._writing_since = time.monotonic()
+            try:
+                results = self._commit_operations(operations)
+            except BaseException as e:
+                for _, future, _ in group:
+                    future.set_exception(e)
+                continue
+            finally:
+                self._writing_since = None
+            offset = 0
+            for ops, future, _ in group:
+                future.set_result(results[offset:offset + len(ops)])
+                offset += len(ops)
+
+    def _commit_operations(self, operations):
+        """
+        Evaluate operations in order, persist them with one write, then apply them.
+
+        Only staging and applying hold the store lock; the write itself
+        does not, so reads carry on meanwhile and see the previous state.
+        """
+        with self._writing():
+            staged = {}
+            changes = []
+            results = []
+            with self._lock:
+                for kind, ticket_id, payload in operations:
+                    current = staged[ticket_id] if ticket_id in staged else self._tickets.get(ticket_id)
+                    if kind == 'add':
+                        ticket = result = payload
+                    elif current is None:
+                        results.append(None)
+                        continue
+                    elif kind == 'update':
+                        ticket = result = current.replace(payload)
+                    else:
+                        ticket, result = None, current
+                    staged[ticket_id] = ticket
+                    changes.append((ticket_id, ticket))
+                    results.append(result)
+            if changes:
+                self._persist(changes)
+                with self._lock:
+                    for ticket_id, ticket in changes:
+                        self._apply(ticket_id, ticket)
+            return results
+
+    def _apply(self, ticket_id, ticket):
+        """Apply a change to the id map and secondary indexes."""
+        old = self._tickets.get(ticket_id)
+        # Status moves are the common update; they leave the search index alone
+        text = not (old is not None and ticket is not None
+                    and getattr(old, 'title', None) == getattr(ticket, 'title', None)
+                    and getattr(old, '_description', None) == getattr(ticket, '_description', None))
+        # Sorted indexes are lists, so only entries whose key changed are moved
+        if old is not None:
+            self._unindex(old, text=text, new=ticket)
+        if ticket is None:
+            self._tickets.pop(ticket_id, None)
+        else:
+            self._tickets[ticket_id] = ticket
+            self._index(ticket, text=text, old=old)
+        self.version += 1
+        while self._changes and len(self._changes) >= CHANGE_LOG_SIZE:
+            self._log_floor = self._changes.popleft()[0]
+        self._changes.append((self.version, ticket_id, ticket))
+        self._changed.notify_all()
+
+    def _expand(self, term):
+        """Return the indexed words a query word matches."""
+        if len(term) < SEARCH_MIN_PREFIX:
+            return [term] if term in self._postings else []
+        vocab = self._vocab
+        i = bisect.bisect_left(vocab, term)
+        tokens = []
+        while i < len(vocab) and vocab[i].startswith(term) and len(tokens) < SEARCH_MAX_EXPANSIONS:
+            tokens.append(vocab[i])
+            i += 1
+        return tokens
+
+    def _index(self, ticket, text=True, old=None):
+        """Add ticket to the indexes, except entries it shares with the ticket it replaces."""
+        status = _status_key(ticket)
+        if old is None or _status_key(old) != status:
+            self._by_status.setdefault(status, {})[ticket.id] = None
+        by_due, open_due, natural = _sorted_keys(ticket)
+        old_by_due, old_open_due, old_natural = _sorted_keys(old)
+        if by_due != old_by_due:
+            bisect.insort(self._by_due, by_due)
+        if open_due is not None and open_due != old_open_due:
+            bisect.insort(self._open_due, open_due)
+        if natural != old_natural:
+            # New tickets have the newest key, so this is normally an append
+            bisect.insort(self._ordered, natural)
+        if text:
+            all_postings = self._postings
+            ticket_id = ticket.id
+            for token, weight in _text_weights(ticket).items():
+                postings = all_postings.get(token)
+                if postings is None:
+                    postings = all_postings[token] = {}
+                    bisect.insort(self._vocab, token)
+                postings[ticket_id] = weight
+
+    def _unindex(self, ticket, text=True, new=None):
+        """Remove ticket from the indexes, except entries its replacement keeps."""
+        status = _status_key(ticket)
+        bucket = self._by_status.get(status)
+        if bucket is not None and (new is None or _status_key(new) != status):
+            bucket.pop(ticket.id, None)
+            if not bucket:
+                del self._by_status[status]
+        by_due, open_due, natural = _sorted_keys(ticket)
+        new_by_due, new_open_due, new_natural = _sorted_keys(new)
+        if by_due != new_by_due:
+            _remove_sorted(self._by_due, by_due)
+        if open_due is not None and open_due != new_open_due:
+            _remove_sorted(self._open_due, open_due)
+        if natural != new_natural:
+            _remove_sorted(self._ordered, natural)
+        if text:
+            for token in _text_weights(ticket):
+                postings = self._postings.get(token)
+                if postings is not None:
+                    postings.pop(ticket.id, None)
+                    if not postings:
+                        del self._postings[token]
+                        _remove_sorted(self._vocab, token)
+
+    @timed('persist')
+    def _persist(self, changes):
+        """Write (ticket_id, ticket) changes to storage before they are applied."""
+        try:
+            self.backend.write(changes, self._tickets)
+        except Exception as e:
+            self.last_persist_error = (time.time(), f'{type(e).__name__}: {e}')
+            raise
+        self.last_persist = time.time()
+        if self.backend.needs_compaction():
+            self._compact_wanted.set()
+
+    def _start_compactor(self):
+        if self._compactor is None:
+            self._compactor = threading.Thread(target=self._compact_loop,
+                                               name='ticket-store-compactor', daemon=True)
+            self._compactor.start()
+
+    def _compact_loop(self):
+        while not self._closed.is_set():
+            self._compact_wanted.wait(JOURNAL_COMPACT_INTERVAL)
+            self._compact_wanted.clear()
+            if self._closed.is_set():
+                break
+            try:
+                self.compact()
+            except Exception:
+                app.logger.exception('Storage compaction failed')
+
+
+_store = None
+_store_key = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return the process-wide ticket store, loading it on first use.
+
+    The store is rebuilt if the storage settings point somewhere else.
+    """
+    global _store, _store_key
+    key = (STORAGE_BACKEND, DATA_FILE, SQLITE_FILE, JOURNAL_ENABLED)
+    store = _store
+    if store is None or _store_key != key:
+        with _store_lock:
+            if _store is None or _store_key != key:
+                if _store is not None:
+                    _store.close()
+                store = TicketStore(backend=create_backend(), group_commit=GROUP_COMMIT_ENABLED)
+                store.load()
+                _store, _store_key = store, key
+            store = _store
+    return store
+
+
+def close_store():
+    """Close the process-wide store, if loaded; used when a worker exits."""
+    global _store, _store_key
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+        _store = _store_key = None
+
+
+def content_codings():
+    """Content codings this process can produce, most preferred first."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(data, encoding, level=None):
+    """Compress bytes for a Content-Encoding; level None means maximum."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if level is None else level)
+    # A fixed mtime keeps the output identical across workers and restarts
+    return gzip.compress(data, compresslevel=9 if level is None else level, mtime=0)
+
+
+def negotiate_encoding(available):
+    """Pick the best content coding the client accepts, or 'identity'."""
+    return request.accept_encodings.best_match(
+        [encoding for encoding in content_codings() if encoding in available]) or 'identity'
+
+
+# HTML pages are served from memory; browsers may reuse them for this many
+# seconds before revalidating with their ETag
+STATIC_PAGES = ('index.html', 'board.html')
+STATIC_MAX_AGE = int(os.environ.get('TICKETS_STATIC_MAX_AGE', '300'))
+
+
+class StaticPage:
+    """
+    A page read once at startup, with precompressed variants.
+
+    Each variant (identity, gzip and, if available, brotli) has its own
+    strong ETag derived from the page content, so caches never mix them up.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        tag = hashlib.sha256(data).hexdigest()[:20]
+        self.variants = {'identity': (data, tag)}
+        for encoding in content_codings():
+            body = compress(data, encoding)
+            if len(body) < len(data):
+                self.variants[encoding] = (body, f'{tag}-{encoding}')
+
+    def response(self):
+        """Build the response for the current request, 304 if unchanged."""
+        encoding = negotiate_encoding(self.variants)
+        body, etag = self.variants[encoding]
+        response = app.response_class(body, mimetype='text/html')
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}'
+        return response.make_conditional(request)
+
+
+_static_pages = {}
+
+
+def load_static_pages():
+    """Read and compress the HTML pages; missing pages fall back to disk."""
+    for name in STATIC_PAGES:
+        path = os.path.join(app.root_path, name)
+        if os.path.exists(path):
+            _static_pages[name] = StaticPage(path)
+
+
+load_static_pages()
+
+
+def serve_page(name):
+    page = _static_pages.get(name)
+    if page is None:
+        return send_from_directory('.', name)
+    return page.response()
 
 
 # Serve static HTML files
 @app.route('/')
 def serve_index():
-    return send_from_directory('.', 'index.html')
+    return serve_page('index.html')
 
 
 @app.route('/index.html')
 def serve_index_html():
-    return send_from_directory('.', 'index.html')
+    return serve_page('index.html')
 
 
 @app.route('/board.html')
 def serve_board():
-    return send_from_directory('.', 'board.html')
+    return serve_page('board.html')
+
+
+# Fields GET /api/tickets can sort by; prefix with '-' for descending
+SORT_FIELDS = ('created_at', 'updated_at', 'due_date', 'title', 'status')
+
+# Query parameters holding inclusive date/datetime bounds
+RANGE_PARAMS = ('due_from', 'due_to', 'created_from', 'created_to')
+
+# Page size for cursor pagination when only 'after' is given, and the cap
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def parse_ticket_filters(args):
+    """
+    Parse list filter query parameters.
+
+    Returns (filters, error) where filters are keyword arguments for
+    TicketStore.query() and error is a message for a 400 response.
+    """
+    filters = {}
+    statuses = [s for value in args.getlist('status') for s in value.split(',') if s]
+    if statuses:
+        filters['statuses'] = statuses
+    for param in RANGE_PARAMS:
+        value = args.get(param)
+        if value:
+            try:
+                datetime.fromisoformat(value)
+            except ValueError:
+                return None, f'Invalid date for {param}: {value}'
+            filters[param] = value
+    sort = args.get('sort')
+    if sort:
+        descending = sort.startswith('-')
+        field = sort.lstrip('-')
+        if field not in SORT_FIELDS:
+            return None, f'Invalid sort field: {field}'
+        filters['sort'] = field
+        filters['descending'] = descending
+    return filters, None
+
+
+def not_modified(etag):
+    """Return a 304 response if the client already holds etag, else None."""
+    # Weak comparison: compressed responses carry the tag as W/"..."
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+
+def with_etag(response, etag):
+    """Tag a response and ask clients to revalidate before reusing it."""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+# API responses of at least COMPRESS_MIN_SIZE bytes are compressed for
+# clients that accept it, at COMPRESS_LEVEL (gzip, 1-9) or BROTLI_QUALITY
+# (0-11). Encoded list bodies, plain and compressed, are cached per store
+# version, up to RESPONSE_CACHE_MB; a write changes the version, so stale
+# bodies are never served and age out of the LRU.
+COMPRESS_MIN_SIZE = int(os.environ.get('TICKETS_COMPRESS_MIN_SIZE', '1024'))
+COMPRESS_LEVEL = int(os.environ.get('TICKETS_COMPRESS_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('TICKETS_BROTLI_QUALITY', '4'))
+RESPONSE_CACHE_MB = float(os.environ.get('TICKETS_RESPONSE_CACHE_MB', '32'))
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of encoded response bodies, bounded in bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+_response_cache = ResponseCache(int(RESPONSE_CACHE_MB * 1024 * 1024))
+
+
+def cache_response(key, response, etag):
+    """Keep the encoded body of response under key and tag it with etag."""
+    _response_cache.put(key, response.get_data())
+    return with_etag(response, etag)
+
+
+@app.after_request
+def compress_response(response):
+    """
+    Compress API responses with the best coding the client accepts.
+
+    Streamed responses (exports, event streams) and small bodies are sent
+    as they are. GET responses tagged with a store version are cached by
+    version, URL and coding, so polling an unchanged list compresses it
+    only once. Compressed responses carry the tag as a weak ETag, since
+    the bytes differ from the uncompressed representation.
+    """
+    if (not request.path.startswith('/api/') or response.is_streamed
+            or response.direct_passthrough or response.status_code not in (200, 201)
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(content_codings())
+    if encoding == 'identity' or response.calculate_content_length() < COMPRESS_MIN_SIZE:
+        return response
+    etag, _ = response.get_etag()
+    key = (etag, request.full_path, encoding) if etag and request.method == 'GET' else None
+    body = _response_cache.get(key) if key else None
+    if body is None:
+        level = BROTLI_QUALITY if encoding == 'br' else COMPRESS_LEVEL
+        body = compress(response.get_data(), encoding, level)
+        if key:
+            _response_cache.put(key, body)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
 
 
 # API Routes
 @app.route('/api/tickets', methods=['GET'])
 def get_tickets():
-    """Get all tickets."""
-    tickets = load_tickets()
-    return jsonify(tickets)
+    """
+    Get all tickets, optionally filtered and sorted.
+
+    Query parameters: status (comma-separated or repeated), due_from,
+    due_to, created_from, created_to (inclusive ISO dates) and sort
+    (a field name, '-' prefix for descending).
+    
+    With limit and/or after, results are paged in creation order; the
+    cursor for the next page is returned in the X-Next-Cursor header.
+    
+    Responses carry the store version as ETag; a matching If-None-Match
+    gets 304 Not Modified without serializing anything. Unpaged bodies
+    are cached per version and URL, so repeated polls of an unchanged
+    view are not serialized again.
+    """
+    store = get_store()
+    store.refresh()
+    # Read the tag before the data: a write in between only makes the tag
+    # older than the body, which costs a refetch rather than a stale 304
+    etag = store.etag
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    key = (etag, request.full_path, 'identity')
+    body = _response_cache.get(key)
+    if body is not None:
+        return with_etag(app.response_class(body, mimetype='application/json'), etag)
+    
+    if not request.args:
+        return cache_response(key, jsonify(store.all()), etag)
+    
+    filters, error = parse_ticket_filters(request.args)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    limit = request.args.get('limit')
+    after = request.args.get('after')
+    if limit is None and after is None:
+        return cache_response(key, jsonify(store.query(**filters)), etag)
+    
+    # Cursor pagination
+    try:
+        limit = DEFAULT_PAGE_SIZE if limit is None else int(limit)
+    except ValueError:
+        return jsonify({'error': f'Invalid limit: {limit}'}), 400
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+    if filters.pop('sort', 'created_at') != 'created_at':
+        return jsonify({'error': 'Cursor pagination only supports sort=created_at'}), 400
+    try:
+        after_key = decode_cursor(after) if after else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    tickets, next_key = store.page(limit, after=after_key, **filters)
+    response = jsonify(tickets)
+    if next_key is not None:
+        response.headers['X-Next-Cursor'] = encode_cursor(next_key)
+    return with_etag(response, etag)
+
+
+def parse_version(store, tag):
+    """
+    Parse a version tag ('<epoch>-<version>', optionally quoted or weak).
+
+    Returns the version number, None if the tag belongs to another store
+    instance (so the client must resync), or False if it is malformed.
+    """
+    epoch, _, number = tag.strip().removeprefix('W/').strip('"').rpartition('-')
+    if not number.isdigit():
+        return False
+    return int(number) if epoch == store.epoch else None
+
+
+def format_changes(changes):
+    """Render (ticket_id, ticket) changes as upserts and delete tombstones."""
+    return [
+        {'op': 'upsert', 'id': ticket_id, 'ticket': ticket} if ticket is not None
+        else {'op': 'delete', 'id': ticket_id}
+        for ticket_id, ticket in changes
+    ]
+
+
+@app.route('/api/tickets/changes', methods=['GET'])
+def get_ticket_changes():
+    """
+    Get tickets created, updated or deleted since a version.
+    
+    'since' is the ETag value (without quotes) or 'version' from an earlier
+    response. Deleted tickets come back as tombstones. If the version is
+    too old, or came from another worker or an earlier run, the response
+    is 410 with 'resync' set and the client should reload the full list.
+    """
+    since = request.args.get('since', '')
+    store = get_store()
+    version = parse_version(store, since)
+    if version is False:
+        return jsonify({'error': f'Invalid since version: {since}'}), 400
+    
+    etag, changes = store.changes_since(version) if version is not None else (store.etag, None)
+    if changes is None:
+        return jsonify({'error': 'Resync required', 'resync': True, 'version': etag}), 410
+    
+    return jsonify({'version': etag, 'changes': format_changes(changes)})
+
+
+_sse_subscribers = 0
+_sse_lock = threading.Lock()
+_sse_ending = threading.Event()
+
+
+def sse_event(event, data, event_id):
+    """Format one Server-Sent Event."""
+    return f'id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=_json_default)}\n\n'
+
+
+def ticket_event_stream(store, version):
+    """
+    Yield change events for a subscriber, starting after version.
+    
+    Event IDs are version tags, so a reconnecting EventSource resumes via
+    Last-Event-ID. A version that is no longer covered (or None) produces
+    a 'resync' event telling the client to reload the full list.
+    """
+    yield f'retry: {SSE_RETRY_MS}\n\n'
+    last_write = time.monotonic()
+    while not _sse_ending.is_set():
+        if version is None:
+            store.refresh()
+            etag, changes = store.etag, None
+        else:
+            etag, changes = store.changes_since(version)
+        if changes is None:
+            yield sse_event('resync', {'version': etag}, etag)
+        elif changes:
+            yield sse_event('changes', {'version': etag, 'changes': format_changes(changes)}, etag)
+        if changes is None or changes:
+            version = int(etag.rpartition('-')[2])
+            last_write = time.monotonic()
+        elif time.monotonic() - last_write >= SSE_HEARTBEAT:
+            yield ': keep-alive\n\n'
+            last_write = time.monotonic()
+        store.wait_for_change(version, SSE_POLL_INTERVAL)
+
+
+def end_event_streams():
+    """
+    Make open event streams finish within SSE_POLL_INTERVAL.
+
+    Called when a worker is shutting down; only sets a flag, so it is safe
+    in a signal handler.
+    """
+    _sse_ending.set()
+
+
+def release_sse_subscriber():
+    global _sse_subscribers
+    with _sse_lock:
+        _sse_subscribers -= 1
+
+
+@app.route('/api/tickets/events', methods=['GET'])
+def stream_ticket_events():
+    """
+    Push ticket changes to the client as Server-Sent Events.
+    
+    Starts after the version in the Last-Event-ID header (on reconnect) or
+    the 'since' query parameter, or from the current version if neither
+    is given. Each worker serves at most SSE_MAX_SUBSCRIBERS streams;
+    beyond that the request is refused with 503 and clients fall back to
+    polling.
+    """
+    global _sse_subscribers
+    store = get_store()
+    tag = request.headers.get('Last-Event-ID') or request.args.get('since')
+    if tag:
+        version = parse_version(store, tag)
+        if version is False:
+            return jsonify({'error': f'Invalid version: {tag}'}), 400
+    else:
+        store.refresh()
+        version = store.version
+    
+    with _sse_lock:
+        if _sse_subscribers >= SSE_MAX_SUBSCRIBERS:
+            response = jsonify({'error': 'Too many event stream subscribers'})
+            response.status_code = 503
+            response.headers['Retry-After'] = '30'
+            return response
+        _sse_subscribers += 1
+    
+    response = Response(ticket_event_stream(store, version), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.call_on_close(release_sse_subscriber)
+    return response
+
+
+@app.route('/api/tickets/stats', methods=['GET'])
+def get_ticket_stats():
+    """
+    Get ticket counts per status, overdue and due within the next 7 days.
+    
+    The counts are maintained as tickets change, so this is cheap enough
+    to call after every board refresh.
+    """
+    return jsonify(get_store().stats())
+
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Metrics of this process in the Prometheus text exposition format.
+    
+    Request counts and latency histograms per route, storage operation
+    timings, in-flight requests, the ticket count and the size of the
+    data files.
+    """
+    store = get_store()
+    store.refresh()
+    sizes = [(path, os.path.getsize(path)) for path in store.backend.files() if os.path.exists(path)]
+    with _metrics_lock:
+        counts = sorted(_request_counts.items())
+        requests = sorted((key, list(h.samples()), h.sum) for key, h in _request_latency.items())
+        storage = sorted((key, list(h.samples()), h.sum) for key, h in _storage_latency.items())
+        in_flight = len(_active_requests)
+    
+    lines = [
+        '# HELP tickets_http_requests_total HTTP requests by method, route and status.',
+        '# TYPE tickets_http_requests_total counter',
+    ]
+    lines += [f'tickets_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}'
+              for (method, route, status), count in counts]
+    lines += [
+        '# HELP tickets_http_request_duration_seconds Time to produce HTTP responses.',
+        '# TYPE tickets_http_request_duration_seconds histogram',
+    ]
+    for (method, route), samples, total in requests:
+        lines += _histogram_lines('tickets_http_request_duration_seconds',
+                                  f'method="{method}",route="{route}"', samples, total)
+    lines += [
+        '# HELP tickets_storage_duration_seconds Time spent loading and persisting tickets.',
+        '# TYPE tickets_storage_duration_seconds histogram',
+    ]
+    for operation, samples, total in storage:
+        lines += _histogram_lines('tickets_storage_duration_seconds',
+                                  f'operation="{operation}"', samples, total)
+    lines += [
+        '# HELP tickets_http_requests_in_flight HTTP requests being served.',
+        '# TYPE tickets_http_requests_in_flight gauge',
+        f'tickets_http_requests_in_flight {in_flight}',
+        '# HELP tickets_count Tickets in the store.',
+        '# TYPE tickets_count gauge',
+        f'tickets_count {len(store)}',
+        '# HELP tickets_data_file_bytes Size of the files holding the tickets.',
+        '# TYPE tickets_data_file_bytes gauge',
+    ]
+    lines += [f'tickets_data_file_bytes{{file="{os.path.basename(path)}"}} {size}' for path, size in sizes]
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+
+def _histogram_lines(name, labels, samples, total):
+    """Exposition lines for one histogram series."""
+    lines = [f'{name}_bucket{{{labels},le="{le}"}} {count}' for le, count in samples]
+    lines.append(f'{name}_sum{{{labels}}} {total}')
+    lines.append(f'{name}_count{{{labels}}} {samples[-1][1]}')
+    return lines
+
+
+# A write waiting or committing, or a request running, for longer than
+# this many seconds means the worker is stuck
+HEALTH_STALL_SECONDS = float(os.environ.get('TICKETS_HEALTH_STALL_SECONDS', '30'))
+# A failed persist keeps /readyz failing until a write succeeds or this many
+# seconds pass, so an idle worker recovers from a transient error
+HEALTH_PERSIST_ERROR_SECONDS = float(os.environ.get('TICKETS_HEALTH_PERSIST_ERROR_SECONDS', '60'))
+
+
+def _iso_time(timestamp):
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp is not None else None
+
+
+def stall_problems(writer):
+    """Describe stalled writes or requests; writer is TicketStore.health() or None."""
+    problems = []
+    if writer is not None:
+        waited = max(writer['oldest_queued_s'], writer['commit_running_s'])
+        if waited > HEALTH_STALL_SECONDS:
+            problems.append(f'writer stalled for {waited:.0f}s')
+    now = time.perf_counter()
+    with _metrics_lock:
+        oldest = min(_active_requests.values(), default=now)
+    if now - oldest > HEALTH_STALL_SECONDS:
+        problems.append(f'request running for {now - oldest:.0f}s')
+    return problems
+
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """
+    Liveness: 200 unless a write or request has been stuck for longer than
+    HEALTH_STALL_SECONDS, in which case restarting the worker is the fix.
+    
+    Never loads or reads the store, so it stays cheap under load.
+    """
+    store = _store
+    problems = stall_problems(store.health() if store is not None else None)
+    if problems:
+        return jsonify({'status': 'stalled', 'problems': problems}), 503
+    return jsonify({'status': 'ok'})
+
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """
+    Readiness: 200 when the store is loaded, writes are being persisted
+    and nothing is stalled, 503 otherwise. A failed persist counts until
+    a later one succeeds or HEALTH_PERSIST_ERROR_SECONDS pass. The body
+    reports the signals: store state, writer queue depth, last persist
+    and in-flight requests.
+    """
+    store = _store
+    problems = []
+    if store is None:
+        state = 'loading' if _store_lock.locked() else 'not_loaded'
+        problems.append(f'store {state}')
+        writer = None
+    else:
+        state = 'loaded'
+        writer = store.health()
+        error = store.last_persist_error
+        if (error and time.time() - error[0] < HEALTH_PERSIST_ERROR_SECONDS
+                and (store.last_persist is None or error[0] > store.last_persist)):
+            problems.append('last persist failed')
+    problems += stall_problems(writer)
+    now = time.perf_counter()
+    with _metrics_lock:
+        in_flight = len(_active_requests)
+        oldest = min(_active_requests.values(), default=now)
+    body = {
+        'status': 'not_ready' if problems else 'ready',
+        'problems': problems,
+        'store': state,
+        'tickets': len(store) if store is not None else None,
+        'version': store.etag if store is not None else None,
+        'writer': writer,
+        'requests': {'in_flight': in_flight, 'oldest_s': round(now - oldest, 3)},
+        'stall_threshold_s': HEALTH_STALL_SECONDS,
+    }
+    return jsonify(body), 503 if problems else 200
+
+
+def check_profile_access():
+    """Return an error response if the profiles may not be read, else None."""
+    if not PROFILE_TOKEN:
+        return jsonify({'error': 'Profile access is not enabled'}), 404
+    if not profile_token_valid():
+        return jsonify({'error': 'Invalid or missing X-Profile-Token'}), 403
+    return None
+
+
+@app.route('/api/profiles', methods=['GET'])
+def list_profiles():
+    """List the saved request profiles, newest first."""
+    denied = check_profile_access()
+    if denied:
+        return denied
+    profiles = []
+    for name in reversed(_list_profiles()):
+        try:
+            stat = os.stat(os.path.join(PROFILE_DIR, name))
+        except FileNotFoundError:
+            continue
+        profiles.append({
+            'id': name,
+            'size': stat.st_size,
+            'created_at': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+        })
+    return jsonify(profiles)
+
+
+@app.route('/api/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """
+    Download a saved profile in pstats format (for pstats, snakeviz, ...).
+    
+    With format=text the top 'limit' functions by cumulative time are
+    returned as a plain-text report instead.
+    """
+    denied = check_profile_access()
+    if denied:
+        return denied
+    if profile_id not in _list_profiles():
+        return jsonify({'error': 'Profile not found'}), 404
+    path = os.path.join(PROFILE_DIR, profile_id)
+    if request.args.get('format') != 'text':
+        return send_from_directory(os.path.abspath(PROFILE_DIR), profile_id, as_attachment=True,
+                                   mimetype='application/octet-stream')
+    try:
+        limit = int(request.args.get('limit', '40'))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    report = io.StringIO()
+    pstats.Stats(path, stream=report).sort_stats('cumulative').print_stats(limit)
+    return Response(report.getvalue(), mimetype='text/plain')
+
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+
+@app.route('/api/tickets/search', methods=['GET'])
+def search_tickets():
+    """
+    Find tickets by words in their title or description.
+    
+    'q' is the search text; every word must match, and partial words
+    match as prefixes. Up to 'limit' tickets are returned, best match
+    first.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Missing search text: q'}), 400
+    limit = request.args.get('limit')
+    try:
+        limit = SEARCH_DEFAULT_LIMIT if limit is None else int(limit)
+    except ValueError:
+        return jsonify({'error': f'Invalid limit: {limit}'}), 400
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        return jsonify({'error': f'limit must be between 1 and {SEARCH_MAX_LIMIT}'}), 400
+    
+    return jsonify(get_store().search(query, limit=limit))
 
 
 @app.route('/api/tickets/<ticket_id>', methods=['GET'])
 def get_ticket(ticket_id):
     """Get a specific ticket by ID."""
-    tickets = load_tickets()
-    ticket = next((t for t in tickets if t['id'] == ticket_id), None)
+    store = get_store()
+    store.refresh()
+    etag = store.etag
+    ticket = store.get(ticket_id)
     if ticket:
-        return jsonify(ticket)
+        return not_modified(etag) or with_etag(jsonify(ticket), etag)
     return jsonify({'error': 'Ticket not found'}), 404
 
 
-@app.route('/api/tickets', methods=['POST'])
-def create_ticket():
-    """Create a new ticket."""
-    data = request.get_json()
+# Column order for CSV exports; other ticket fields are NDJSON-only
+EXPORT_FIELDS = ['id', 'title', 'description', 'due_date', 'status', 'created_at', 'updated_at']
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def chunked(pieces):
+    """
+    Join small strings into chunks of about EXPORT_CHUNK_SIZE.
     
-    if not data:
-        return jsonify({'error': 'No data provided'}), 400
+    The first piece is sent on its own so the client gets the first byte
+    immediately.
+    """
+    buffer = []
+    size = 0
+    first = True
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if first or size >= EXPORT_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+            first = False
+    if buffer:
+        yield ''.join(buffer)
+
+
+def export_ndjson(tickets):
+    """Yield tickets as newline-delimited JSON."""
+    for ticket in tickets:
+        yield json.dumps(ticket.to_dict(), ensure_ascii=False) + '\n'
+
+
+def export_csv(tickets):
+    """Yield a CSV header and one row per ticket."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for ticket in tickets:
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(ticket.to_dict())
+    yield buffer.getvalue()
+
+
+@app.route('/api/tickets/export', methods=['GET'])
+def export_tickets():
+    """
+    Stream tickets as NDJSON (default) or CSV.
     
-    required_fields = ['title', 'description', 'due_date']
-    for field in required_fields:
-        if field not in data or not data[field]:
-            return jsonify({'error': f'Missing required field: {field}'}), 400
+    Accepts the same filter and sort parameters as GET /api/tickets.
+    Tickets are serialized chunk by chunk while the response is sent, so
+    memory does not grow with the size of the export.
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'Unsupported export format: {export_format}'}), 400
     
-    tickets = load_tickets()
+    filters, error = parse_ticket_filters(request.args)
+    if error:
+        return jsonify({'error': error}), 400
     
-    new_ticket = {
-        'id': str(uuid.uuid4()),
+    tickets = get_store().query(**filters)
+    rows = export_csv(tickets) if export_format == 'csv' else export_ndjson(tickets)
+    response = Response(chunked(rows), mimetype=EXPORT_FORMATS[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename=tickets.{export_format}'
+    return response
+
+
+REQUIRED_FIELDS = ['title', 'description', 'due_date']
+UPDATABLE_FIELDS = ['title', 'description', 'due_date', 'status']
+
+# Largest number of operations accepted by POST /api/tickets/batch
+BATCH_MAX_OPERATIONS = int(os.environ.get('TICKETS_BATCH_MAX_OPERATIONS', '10000'))
+
+
+def validate_new_ticket(data):
+    """Return an error message if data cannot create a ticket, else None."""
+    if not data:
+        return 'No data provided'
+    if not isinstance(data, dict):
+        return 'Ticket data must be a JSON object'
+    for field in REQUIRED_FIELDS:
+        if field not in data or not data[field]:
+            return f'Missing required field: {field}'
+    return validate_status(data)
+
+
+def validate_ticket_update(data):
+    """Return an error message if data cannot update a ticket, else None."""
+    if not data:
+        return 'No data provided'
+    if not isinstance(data, dict):
+        return 'Ticket data must be a JSON object'
+    return validate_status(data)
+
+
+def validate_status(data):
+    """Return an error message if data carries a status that is not a string."""
+    if 'status' in data and not isinstance(data['status'], str):
+        return 'status must be a string'
+    return None
+
+
+def build_ticket(data):
+    """Build a new ticket from validated request data."""
+    return {
+        'id': new_ticket_id(),
         'title': data['title'],
         'description': data['description'],
         'due_date': data['due_date'],
         'status': data.get('status', 'todo'),
         'created_at': datetime.now().isoformat()
     }
+
+
+def build_changes(data):
+    """Build the field changes for a ticket update from validated data."""
+    changes = {field: data[field] for field in UPDATABLE_FIELDS if field in data}
+    changes['updated_at'] = datetime.now().isoformat()
+    return changes
+
+
+@app.route('/api/tickets', methods=['POST'])
+def create_ticket():
+    """Create a new ticket."""
+    data = request.get_json()
     
-    tickets.append(new_ticket)
-    save_tickets(tickets)
+    error = validate_new_ticket(data)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    new_ticket = build_ticket(data)
+    get_store().add(new_ticket)
     
     return jsonify(new_ticket), 201
 
 
+def parse_batch_operations():
+    """
+    Read batch operations from a JSON array or an NDJSON body.
+    
+    Returns (operations, error). Unparseable NDJSON lines are kept as None
+    so they are reported at their position instead of failing the batch.
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        operations = []
+        for line in request.get_data(as_text=True).splitlines():
+            if line.strip():
+                try:
+                    operations.append(json.loads(line))
+                except ValueError:
+                    operations.append(None)
+    else:
+        operations = request.get_json(silent=True)
+        if not isinstance(operations, list):
+            return None, 'Expected a JSON array of operations'
+    if not operations:
+        return None, 'No operations provided'
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        return None, f'Too many operations (max {BATCH_MAX_OPERATIONS})'
+    return operations, None
+
+
+@app.route('/api/tickets/batch', methods=['POST'])
+def batch_tickets():
+    """
+    Create, update and delete many tickets in one request.
+    
+    The body is a JSON array (or NDJSON, one operation per line) of
+    {"op": "create", "data": {...}}, {"op": "update", "id": ..., "data": {...}}
+    and {"op": "delete", "id": ...}. Each operation is validated like the
+    single-ticket endpoints; valid ones are applied in order with one
+    write to disk. The response lists a status and ticket or error for
+    every operation, in request order.
+    """
+    operations, error = parse_batch_operations()
+    if error:
+        return jsonify({'error': error}), 400
+    
+    results = [None] * len(operations)
+    planned = []
+    for index, operation in enumerate(operations):
+        op = operation.get('op') if isinstance(operation, dict) else None
+        ticket_id = operation.get('id') if isinstance(operation, dict) else None
+        if op == 'create':
+            error = validate_new_ticket(operation.get('data'))
+            if not error:
+                ticket = build_ticket(operation['data'])
+                planned.append((index, ('add', ticket['id'], ticket)))
+        elif op in ('update', 'delete'):
+            error = None if isinstance(ticket_id, str) and ticket_id else 'Missing ticket id'
+            if not error and op == 'update':
+                error = validate_ticket_update(operation.get('data'))
+            if not error:
+                payload = build_changes(operation['data']) if op == 'update' else None
+                planned.append((index, (op, ticket_id, payload)))
+        else:
+            error = 'Invalid operation' if op is None else f'Unknown op: {op}'
+        if error:
+            results[index] = {'status': 400, 'error': error}
+    
+    outcomes = get_store().apply_batch([step for _, step in planned])
+    for (index, (kind, _, _)), ticket in zip(planned, outcomes):
+        if ticket is None:
+            results[index] = {'status': 404, 'error': 'Ticket not found'}
+        else:
+            results[index] = {'status': 201 if kind == 'add' else 200, 'ticket': ticket}
+    
+    return jsonify({'results': results})
+
+
 @app.route('/api/tickets/<ticket_id>', methods=['PUT'])
 def update_ticket(ticket_id):
     """Update an existing ticket."""
     data = request.get_json()
     
-    if not data:
-        return jsonify({'error': 'No data provided'}), 400
-    
-    tickets = load_tickets()
-    ticket_index = next((i for i, t in enumerate(tickets) if t['id'] == ticket_id), None)
+    error = validate_ticket_update(data)
+    if error:
+        return jsonify({'error': error}), 400
     
-    if ticket_index is None:
+    ticket = get_store().update(ticket_id, build_changes(data))
+    if ticket is None:
         return jsonify({'error': 'Ticket not found'}), 404
     
-    # Update allowed fields
-    allowed_fields = ['title', 'description', 'due_date', 'status']
-    for field in allowed_fields:
-        if field in data:
-            tickets[ticket_index][field] = data[field]
-    
-    tickets[ticket_index]['updated_at'] = datetime.now().isoformat()
-    save_tickets(tickets)
-    
-    return jsonify(tickets[ticket_index])
+    return jsonify(ticket)
 
 
 @app.route('/api/tickets/<ticket_id>', methods=['DELETE'])
 def delete_ticket(ticket_id):
     """Delete a ticket."""
-    tickets = load_tickets()
-    ticket_index = next((i for i, t in enumerate(tickets) if t['id'] == ticket_id), None)
+    deleted_ticket = get_store().delete(ticket_id)
     
-    if ticket_index is None:
+    if deleted_ticket is None:
         return jsonify({'error': 'Ticket not found'}), 404
     
-    deleted_ticket = tickets.pop(ticket_index)
-    save_tickets(tickets)
-    
     return jsonify({'message': 'Ticket deleted', 'ticket': deleted_ticket})
 
 
 if __name__ == '__main__':
+    # Development server; production runs under gunicorn (see gunicorn.conf.py)
     # Initialize empty tickets file if it doesn't exist
     if not os.path.exists(DATA_FILE):
         save_tickets([])
     
+    # Load the store once up front so the first request doesn't pay for it
+    get_store()
+    
     app.run(host='0.0.0.0', port=80, debug=False)
@@ -0,0 +1,250 @@
+"""
+Benchmarks for the Ticket Tracker at realistic data sizes.
+
+Seeds a data file with synthetic tickets, then measures load_tickets,
+save_tickets, loading the store and each API route through the Flask test
+client. Every benchmark reports latency percentiles and, from a separate
+tracemalloc pass, the peak memory allocated by one call.
+
+    python bench_app.py                                   # 1k and 10k tickets
+    python bench_app.py --sizes 1000,10000,100000 --save-baseline bench_baseline.json
+    python bench_app.py --baseline bench_baseline.json    # exit 1 on regression
+
+Timings depend on the machine, so record the baseline (e.g. on main) on
+the same machine or CI runner type that runs the comparison. The regular
+test configuration applies: TICKETS_* environment variables are honoured.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+import app as app_module
+
+DEFAULT_SIZES = (1000, 10000)
+STATUSES = ('todo', 'todo', 'in-progress', 'review', 'completed', 'completed')
+# Differences below these are noise, whatever the relative change
+MIN_REGRESSION = {'p50_ms': 0.1, 'peak_kb': 64}
+WORDS = ('login', 'password', 'button', 'report', 'export', 'invoice', 'search', 'timeout',
+         'layout', 'mobile', 'crash', 'upload', 'cache', 'slow', 'email', 'profile',
+         'permission', 'dashboard', 'filter', 'sync', 'payment', 'locale', 'font', 'api')
+
+
+def make_tickets(count, seed=0):
+    """Return count synthetic tickets with realistic field sizes."""
+    rng = random.Random(seed)
+    today = date.today()
+    created = datetime.now() - timedelta(days=365)
+    tickets = []
+    for i in range(count):
+        created += timedelta(seconds=rng.randint(1, 600))
+        ticket = {
+            'id': app_module.new_ticket_id(),
+            'title': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 8))).capitalize(),
+            'description': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 80))),
+            'due_date': (today + timedelta(days=rng.randint(-30, 90))).isoformat(),
+            'status': rng.choice(STATUSES),
+            'created_at': created.isoformat(),
+        }
+        if i % 3 == 0:
+            ticket['updated_at'] = (created + timedelta(hours=rng.randint(1, 48))).isoformat()
+        tickets.append(ticket)
+    return tickets
+
+
+def measure(func, min_runs, min_time, max_runs=1000):
+    """Call func repeatedly; return per-call durations in seconds."""
+    durations = []
+    deadline = time.perf_counter() + min_time
+    while len(durations) < min_runs or (time.perf_counter() < deadline and len(durations) < max_runs):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def peak_allocation(func, runs=3):
+    """Largest peak of traced memory (bytes) over a few calls of func."""
+    tracemalloc.start()
+    try:
+        peak = 0
+        for _ in range(runs):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            func()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+        return peak
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(durations, peak):
+    ordered = sorted(durations)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+
+    return {
+        'runs': len(ordered),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 4),
+        'p50_ms': round(percentile(50), 4),
+        'p95_ms': round(percentile(95), 4),
+        'p99_ms': round(percentile(99), 4),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def expect(response, status):
+    if response.status_code != status:
+        raise RuntimeError(f'{response.request.method} {response.request.path}: '
+                           f'expected {status}, got {response.status_code}')
+    return response
+
+
+def benchmarks(client, tickets):
+    """Yield (name, func) pairs; the store is loaded with tickets."""
+    rows = [dict(t) for t in tickets]
+    ids = [t['id'] for t in tickets]
+    rng = random.Random(1)
+    new_ticket = {'title': 'Benchmark ticket', 'description': 'Created by bench_app.py',
+                  'due_date': (date.today() + timedelta(days=7)).isoformat()}
+    created = []
+
+    def uncached(func):
+        # A fresh response cache for every call, as after a write
+        def wrapper():
+            app_module._response_cache = app_module.ResponseCache(app_module._response_cache.max_bytes)
+            return func()
+        return wrapper
+
+    def create():
+        created.append(expect(client.post('/api/tickets', json=new_ticket), 201).get_json()['id'])
+
+    def update():
+        ticket_id = rng.choice(ids)
+        expect(client.put(f'/api/tickets/{ticket_id}', json={'status': rng.choice(STATUSES)}), 200)
+
+    def delete():
+        if not created:
+            create()
+        expect(client.delete(f'/api/tickets/{created.pop()}'), 200)
+
+    yield 'load_tickets', lambda: app_module.load_tickets()
+    yield 'save_tickets', lambda: app_module.save_tickets(rows)
+    yield 'store_load', lambda: (app_module.close_store(), app_module.get_store())
+    yield 'list', uncached(lambda: expect(client.get('/api/tickets'), 200))
+    yield 'list_cached', lambda: expect(client.get('/api/tickets'), 200)
+    yield 'list_filtered', uncached(lambda: expect(client.get('/api/tickets?status=todo,review'), 200))
+    yield 'list_page', lambda: expect(client.get('/api/tickets?limit=50'), 200)
+    yield 'get', lambda: expect(client.get(f'/api/tickets/{rng.choice(ids)}'), 200)
+    yield 'search', lambda: expect(client.get('/api/tickets/search?q=login+time'), 200)
+    yield 'stats', lambda: expect(client.get('/api/tickets/stats'), 200)
+    yield 'create', create
+    yield 'update', update
+    yield 'delete', delete
+
+
+def run(sizes, min_runs=5, min_time=1.0, only=None, log=print):
+    """Benchmark every size; return {size: {benchmark: summary}}."""
+    results = {}
+    saved = app_module.DATA_FILE, app_module._response_cache
+    try:
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as directory:
+                tickets = make_tickets(size)
+                app_module.DATA_FILE = os.path.join(directory, 'tickets_data.json')
+                with open(app_module.DATA_FILE, 'w') as f:
+                    json.dump(tickets, f)
+                app_module.close_store()
+                app_module.get_store()
+                client = app_module.app.test_client()
+                results[str(size)] = {}
+                for name, func in benchmarks(client, tickets):
+                    if only and name not in only:
+                        continue
+                    durations = measure(func, min_runs, min_time)
+                    summary = summarize(durations, peak_allocation(func))
+                    results[str(size)][name] = summary
+                    log(f"{size:>7} {name:<14} p50 {summary['p50_ms']:>10.3f} ms  "
+                        f"p95 {summary['p95_ms']:>10.3f} ms  p99 {summary['p99_ms']:>10.3f} ms  "
+                        f"peak {summary['peak_kb']:>10.1f} KB  ({summary['runs']} runs)")
+                app_module.close_store()
+    finally:
+        app_module.DATA_FILE, app_module._response_cache = saved
+    return results
+
+
+def compare(results, baseline, threshold, mem_threshold):
+    """
+    Return a list of regressions against baseline results.
+
+    A benchmark regresses if its median latency grew by more than
+    threshold, or its peak allocation by more than mem_threshold
+    (fractions, 0.25 = 25%), and by more than MIN_REGRESSION. Benchmarks
+    missing on either side are skipped.
+    """
+    regressions = []
+    for size, benches in results.items():
+        for name, current in benches.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            for key, limit in (('p50_ms', threshold), ('peak_kb', mem_threshold)):
+                if (current[key] > previous[key] * (1 + limit)
+                        and current[key] - previous[key] > MIN_REGRESSION[key]):
+                    regressions.append(f'{size} {name}: {key} {previous[key]} -> {current[key]} '
+                                       f'(+{(current[key] / max(previous[key], 1e-9) - 1) * 100:.0f}%)')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='comma-separated ticket counts (default: %(default)s)')
+    parser.add_argument('--only', help='comma-separated benchmark names to run')
+    parser.add_argument('--min-runs', type=int, default=5, help='minimum calls per benchmark')
+    parser.add_argument('--min-time', type=float, default=1.0, help='minimum seconds per benchmark')
+    parser.add_argument('--save-baseline', metavar='FILE', help='write the results to FILE')
+    parser.add_argument('--baseline', metavar='FILE', help='compare against results in FILE')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed median latency growth (default: %(default)s)')
+    parser.add_argument('--mem-threshold', type=float, default=0.25,
+                        help='allowed peak allocation growth (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    only = set(args.only.split(',')) if args.only else None
+    results = run(sizes, args.min_runs, args.min_time, only)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'recorded_at': datetime.now().isoformat(timespec='seconds'),
+                'results': results,
+            }, f, indent=2)
+        print(f'Baseline written to {args.save_baseline}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold, args.mem_threshold)
+        if regressions:
+            print('Regressions against', args.baseline)
+            for regression in regressions:
+                print('  ' + regression)
+            return 1
+        print(f'No regressions against {args.baseline}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Gunicorn configuration for serving the Ticket Tracker in production.
+
+    gunicorn --config gunicorn.conf.py app:app
+
+Every worker process loads its own TicketStore. Workers share the data
+files through the store's cross-process locking (or SQLite with
+TICKETS_STORAGE=sqlite), so any worker count is safe. With more than one
+worker, enable TICKETS_JOURNAL=1 (the Docker image does) or use SQLite, so
+a write does not make the other workers reload the whole data file.
+Settings can be overridden with the environment variables below.
+"""
+
+import os
+import signal
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '80')}")
+
+# Each worker holds the whole ticket collection in memory, so scale with a
+# few processes and let threads absorb concurrent requests; requests are
+# short and mostly served from memory
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+threads = int(os.environ.get('GUNICORN_THREADS', '16'))
+
+# An open /api/tickets/events stream occupies a thread for as long as the
+# board is open. Keep half of each worker's threads for regular requests;
+# boards beyond the cap get 503 and fall back to polling.
+os.environ.setdefault('TICKETS_SSE_MAX_SUBSCRIBERS', str(max(1, threads // 2)))
+
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+
+# Optional periodic worker recycling (0 disables); jitter keeps workers
+# from restarting at the same time
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def post_worker_init(worker):
+    """Load the store before the worker takes requests and end event
+    streams as soon as the worker is asked to stop."""
+    import app
+    app.get_store()
+
+    handle_exit = worker.handle_exit
+
+    def handle_exit_and_end_streams(sig, frame):
+        # Event streams never finish on their own and would hold up a
+        # graceful shutdown or reload until graceful_timeout; browsers
+        # reconnect to another worker
+        app.end_event_streams()
+        handle_exit(sig, frame)
+
+    signal.signal(signal.SIGTERM, handle_exit_and_end_streams)
+
+
+def worker_exit(server, worker):
+    """Stop background work and close storage."""
+    import app
+    app.close_store()
@@ -13,7 +13,7 @@ import json
 import os
 import tempfile
 from datetime import datetime, timedelta
-from app import app, load_tickets, save_tickets, DATA_FILE
+from app import app, load_tickets, save_tickets, get_store, new_ticket_id, Ticket, TicketStore, DATA_FILE
 
 
 class TestConfig:
@@ -63,6 +63,11 @@ class TestConfig:
             tickets.append(json.loads(response.data))
         
         return client, tickets
+    
+    def _ticket(self, ticket_id, **fields):
+        """Minimal stored ticket for tests that use TicketStore directly."""
+        return {'id': ticket_id, 'title': 'T', 'description': 'd',
+                'due_date': '2030-01-01', 'status': 'todo', **fields}
 
 
 class TestTC001TicketCreation(TestConfig):
@@ -959,6 +964,2500 @@ class TestEdgeCases(TestConfig):
         assert response.status_code == 201
         ticket = json.loads(response.data)
         assert ticket['description'] == 'Fix bug for 日本語 users 🎉'
+    
+    def test_non_string_status_rejected(self, client_with_tickets, sample_ticket_data):
+        """
+        Test that a status that is not a string is rejected before anything is written.
+        """
+        client, tickets = client_with_tickets
+        
+        # Act
+        created = client.post('/api/tickets', json={**sample_ticket_data, 'status': ['x']})
+        updated = client.put(f"/api/tickets/{tickets[0]['id']}", json={'status': {'a': 1}})
+        batch = client.post('/api/tickets/batch', json=[{'op': 'create', 'data': {**sample_ticket_data, 'status': 3}}])
+        
+        # Assert
+        assert created.status_code == 400
+        assert created.get_json()['error'] == 'status must be a string'
+        assert updated.status_code == 400
+        assert batch.get_json()['results'][0]['status'] == 400
+        assert len(client.get('/api/tickets').get_json()) == len(tickets)
+    
+    def test_hand_edited_status_does_not_break_loading(self, client, sample_ticket_data):
+        """
+        Test that a stored ticket with a non-string status still loads and can be fixed.
+        """
+        import app as app_module
+        ticket = {**sample_ticket_data, 'id': 'odd', 'status': ['todo'], 'created_at': '2026-01-01T00:00:00'}
+        with open(app_module.DATA_FILE, 'w') as f:
+            json.dump([ticket], f)
+        
+        # Act
+        listed = client.get('/api/tickets')
+        fixed = client.put('/api/tickets/odd', json={'status': 'review'})
+        
+        # Assert
+        assert listed.status_code == 200
+        assert fixed.status_code == 200
+        assert client.get('/api/tickets/stats').get_json()['by_status'] == {'review': 1}
+
+
+class TestTicketStore(TestConfig):
+    """
+    Tests for the process-resident ticket store.
+    """
+    
+    def test_reads_do_not_reload_data_file(self, client, sample_ticket_data, monkeypatch):
+        """
+        Test that list and get requests are served from memory.
+        """
+        # Arrange: Create a ticket, then make any further file reads fail loudly
+        create_response = client.post('/api/tickets',
+                                      data=json.dumps(sample_ticket_data),
+                                      content_type='application/json')
+        ticket_id = json.loads(create_response.data)['id']
+        
+        def fail_load():
+            raise AssertionError('load_tickets() called on the read path')
+        monkeypatch.setattr('app.load_tickets', fail_load)
+        
+        # Act
+        list_response = client.get('/api/tickets')
+        get_response = client.get(f'/api/tickets/{ticket_id}')
+        
+        # Assert
+        assert list_response.status_code == 200
+        assert len(json.loads(list_response.data)) == 1
+        assert get_response.status_code == 200
+    
+    @pytest.mark.parametrize('journal', [False, True])
+    def test_store_uses_its_own_path(self, client, tmp_path, journal):
+        """
+        Test that a store reads, writes and compacts its own file, not DATA_FILE.
+        """
+        import app as app_module
+        other = tmp_path / 'other.json'
+        other.write_text(json.dumps([self._ticket('t1')]))
+        
+        # Act
+        store = TicketStore(str(other), journal=journal)
+        store.load()
+        store.add(self._ticket('t2'))
+        store.compact()
+        store.close()
+        
+        # Assert
+        assert len(store) == 2
+        assert [t['id'] for t in load_tickets(str(other))] == ['t1', 't2']
+        assert load_tickets(app_module.DATA_FILE) == []
+    
+    def test_mutations_are_written_through(self, client, sample_ticket_data):
+        """
+        Test that create, update and delete are persisted to the data file.
+        """
+        # Create
+        create_response = client.post('/api/tickets',
+                                      data=json.dumps(sample_ticket_data),
+                                      content_type='application/json')
+        ticket_id = json.loads(create_response.data)['id']
+        assert [t['id'] for t in load_tickets()] == [ticket_id]
+        
+        # Update
+        client.put(f'/api/tickets/{ticket_id}',
+                   data=json.dumps({'status': 'review'}),
+                   content_type='application/json')
+        assert load_tickets()[0]['status'] == 'review'
+        
+        # Delete
+        client.delete(f'/api/tickets/{ticket_id}')
+        assert load_tickets() == []
+    
+    def test_store_loads_existing_tickets_once(self, tmp_path, monkeypatch):
+        """
+        Test that the store picks up tickets already present in the data file.
+        """
+        # Arrange
+        data_file = tmp_path / "existing.json"
+        with open(data_file, 'w') as f:
+            json.dump([{'id': 'abc', 'title': 'Existing', 'description': 'd',
+                        'due_date': '2030-01-01', 'status': 'todo'}], f)
+        monkeypatch.setattr('app.DATA_FILE', str(data_file))
+        
+        # Act
+        store = get_store()
+        
+        # Assert
+        assert store.get('abc')['title'] == 'Existing'
+        assert get_store() is store
+    
+    def test_failed_write_leaves_store_unchanged(self, client, sample_ticket_data, monkeypatch):
+        """
+        Test that a persistence failure does not leave phantom tickets in memory.
+        """
+        # Arrange
+        def fail_save(tickets, path=None):
+            raise IOError('disk full')
+        monkeypatch.setattr('app.save_tickets', fail_save)
+        
+        # Act
+        with pytest.raises(IOError):
+            get_store().add({**sample_ticket_data, 'id': 'x', 'status': 'todo'})
+        
+        # Assert
+        assert get_store().get('x') is None
+    
+    @pytest.mark.parametrize('journal', [False, True])
+    def test_reads_are_not_blocked_by_a_slow_write(self, tmp_path, monkeypatch, journal):
+        """
+        Test that reads are served from memory while a write waits on the disk.
+        """
+        import threading
+        store = TicketStore(str(tmp_path / 'tickets.json'), journal=journal)
+        store.load()
+        store.add(self._ticket('t1'))
+        writing, release = threading.Event(), threading.Event()
+        real_write = store.backend.write
+        
+        def slow_write(changes, tickets):
+            writing.set()
+            release.wait(5)
+            real_write(changes, tickets)
+        monkeypatch.setattr(store.backend, 'write', slow_write)
+        writer = threading.Thread(target=store.update, args=('t1', {'status': 'completed'}))
+        writer.start()
+        assert writing.wait(5)
+        
+        # Act
+        reader_results = []
+        reader = threading.Thread(target=lambda: reader_results.append((store.get('t1'), store.stats())))
+        reader.start()
+        reader.join(2)
+        release.set()
+        writer.join(5)
+        
+        # Assert: the reader saw the state before the write, which then applied
+        assert reader_results and reader_results[0][0]['status'] == 'todo'
+        assert reader_results[0][1]['by_status'] == {'todo': 1}
+        assert store.get('t1')['status'] == 'completed'
+        store.close()
+    
+    def test_update_only_moves_changed_sorted_entries(self, tmp_path, monkeypatch):
+        """
+        Test that an update re-sorts only the index entries whose key changed.
+        """
+        import app as app_module
+        store = TicketStore(str(tmp_path / 'tickets.json'))
+        store.load()
+        for i in range(5):
+            store.add(self._ticket(f't{i}', due_date=f'2030-01-0{i + 1}', created_at=f'2024-01-0{i + 1}'))
+        moves = []
+        real_insort, real_remove = app_module.bisect.insort, app_module._remove_sorted
+        
+        def insort(items, key):
+            moves.append(('insert', key))
+            real_insort(items, key)
+        
+        def remove_sorted(items, key):
+            moves.append(('remove', key))
+            real_remove(items, key)
+        monkeypatch.setattr(app_module.bisect, 'insort', insort)
+        monkeypatch.setattr(app_module, '_remove_sorted', remove_sorted)
+        
+        # Act / Assert: a status move between open states touches no sorted index
+        store.update('t1', {'status': 'review'})
+        assert moves == []
+        
+        # Completing a ticket only drops its open due date
+        store.update('t1', {'status': 'completed'})
+        assert moves == [('remove', '2030-01-02')]
+        
+        # A new due date moves the due-date entry only
+        moves.clear()
+        store.update('t2', {'due_date': '2030-02-01'})
+        assert moves == [('remove', ('2030-01-03', 't2')), ('remove', '2030-01-03'),
+                         ('insert', ('2030-02-01', 't2')), ('insert', '2030-02-01')]
+        
+        # The indexes match a store built from scratch
+        fresh = TicketStore(str(tmp_path / 'tickets.json'))
+        fresh.load()
+        for name in ('_by_due', '_open_due', '_ordered'):
+            assert getattr(store, name) == getattr(fresh, name)
+        assert {k: list(v) for k, v in store._by_status.items()} == \
+            {k: list(v) for k, v in fresh._by_status.items()}
+        store.close()
+    
+    def test_delete_preserves_listing_order(self, client, sample_ticket_data):
+        """
+        Test that deleting from the id index keeps the remaining order intact.
+        """
+        # Arrange
+        ids = []
+        for i in range(5):
+            response = client.post('/api/tickets',
+                                   data=json.dumps({**sample_ticket_data, 'title': f'T{i}'}),
+                                   content_type='application/json')
+            ids.append(json.loads(response.data)['id'])
+        
+        # Act
+        client.delete(f'/api/tickets/{ids[2]}')
+        client.put(f'/api/tickets/{ids[0]}',
+                   data=json.dumps({'status': 'review'}),
+                   content_type='application/json')
+        
+        # Assert
+        listed = [t['id'] for t in json.loads(client.get('/api/tickets').data)]
+        assert listed == [ids[0], ids[1], ids[3], ids[4]]
+        assert [t['id'] for t in load_tickets()] == listed
+        assert len(get_store()) == 4
+    
+    def test_failed_delete_leaves_ticket_in_place(self, client, sample_ticket_data, monkeypatch):
+        """
+        Test that a delete whose write fails keeps the ticket retrievable.
+        """
+        # Arrange
+        response = client.post('/api/tickets',
+                               data=json.dumps(sample_ticket_data),
+                               content_type='application/json')
+        ticket_id = json.loads(response.data)['id']
+        
+        def fail_save(tickets, path=None):
+            raise IOError('disk full')
+        monkeypatch.setattr('app.save_tickets', fail_save)
+        
+        # Act
+        with pytest.raises(IOError):
+            get_store().delete(ticket_id)
+        
+        # Assert
+        assert get_store().get(ticket_id)['id'] == ticket_id
+
+
+
+class TestJournalPersistence(TestConfig):
+    """
+    Tests for append-only journal mode and compaction.
+    """
+    
+    @pytest.fixture
+    def journal_client(self, client, monkeypatch):
+        """Test client whose store runs in journal mode."""
+        monkeypatch.setattr('app.JOURNAL_ENABLED', True)
+        return client
+    
+    def _journal_lines(self):
+        import app as app_module
+        path = app_module.DATA_FILE + '.journal'
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [json.loads(line) for line in f]
+    
+    def test_mutations_append_single_records(self, journal_client, sample_ticket_data):
+        """
+        Test that each mutation appends one record and leaves the snapshot alone.
+        """
+        # Act
+        response = journal_client.post('/api/tickets',
+                                       data=json.dumps(sample_ticket_data),
+                                       content_type='application/json')
+        ticket_id = json.loads(response.data)['id']
+        journal_client.put(f'/api/tickets/{ticket_id}',
+                           data=json.dumps({'status': 'review'}),
+                           content_type='application/json')
+        journal_client.delete(f'/api/tickets/{ticket_id}')
+        
+        # Assert
+        records = self._journal_lines()
+        assert [r['op'] for r in records] == ['put', 'put', 'del']
+        assert records[1]['ticket']['status'] == 'review'
+        assert load_tickets() == []
+    
+    def test_reload_replays_snapshot_and_journal(self, journal_client, sample_ticket_data):
+        """
+        Test that a fresh store rebuilds state from snapshot + journal.
+        """
+        import app as app_module
+        # Arrange
+        ids = []
+        for i in range(3):
+            response = journal_client.post('/api/tickets',
+                                           data=json.dumps({**sample_ticket_data, 'title': f'T{i}'}),
+                                           content_type='application/json')
+            ids.append(json.loads(response.data)['id'])
+        journal_client.delete(f'/api/tickets/{ids[1]}')
+        
+        # Act
+        store = TicketStore(app_module.DATA_FILE, journal=True)
+        store.load()
+        store.close()
+        
+        # Assert
+        assert [t['id'] for t in store.all()] == [ids[0], ids[2]]
+    
+    def test_compact_folds_journal_into_snapshot(self, journal_client, sample_ticket_data):
+        """
+        Test that compaction writes a snapshot and empties the journal.
+        """
+        # Arrange
+        for i in range(3):
+            journal_client.post('/api/tickets',
+                                data=json.dumps({**sample_ticket_data, 'title': f'T{i}'}),
+                                content_type='application/json')
+        
+        # Act
+        compacted = get_store().compact()
+        
+        # Assert
+        assert compacted is True
+        assert self._journal_lines() == []
+        assert [t['title'] for t in load_tickets()] == ['T0', 'T1', 'T2']
+        assert get_store().compact() is False
+    
+    def test_torn_trailing_record_is_ignored(self, journal_client, sample_ticket_data):
+        """
+        Test that a partially written last line does not break replay.
+        """
+        import app as app_module
+        # Arrange
+        journal_client.post('/api/tickets',
+                            data=json.dumps(sample_ticket_data),
+                            content_type='application/json')
+        with open(app_module.DATA_FILE + '.journal', 'a') as f:
+            f.write('{"op":"put","ticket":{"id":"torn"')
+        
+        # Act
+        store = TicketStore(app_module.DATA_FILE, journal=True)
+        store.load()
+        store.close()
+        
+        # Assert
+        assert len(store) == 1
+        assert store.get('torn') is None
+    
+    def test_compactor_runs_when_threshold_reached(self, journal_client, sample_ticket_data, monkeypatch):
+        """
+        Test that the background compactor is woken by the record threshold.
+        """
+        import time
+        monkeypatch.setattr('app.JOURNAL_COMPACT_RECORDS', 2)
+        
+        # Act
+        for i in range(2):
+            journal_client.post('/api/tickets',
+                                data=json.dumps({**sample_ticket_data, 'title': f'T{i}'}),
+                                content_type='application/json')
+        deadline = time.time() + 5
+        while self._journal_lines() and time.time() < deadline:
+            time.sleep(0.01)
+        
+        # Assert
+        assert self._journal_lines() == []
+        assert len(load_tickets()) == 2
+
+
+
+class TestTicketFiltering(TestConfig):
+    """
+    Tests for server-side filtering and sorting on GET /api/tickets.
+    """
+    
+    @pytest.fixture
+    def client_with_dated_tickets(self, client):
+        """Create tickets with distinct statuses and due dates."""
+        specs = [
+            ('A', 'todo', '2030-01-10'),
+            ('B', 'in-progress', '2030-01-05'),
+            ('C', 'todo', '2030-02-01'),
+            ('D', 'completed', '2030-01-20'),
+            ('E', 'review', '2030-01-05'),
+        ]
+        for title, status, due_date in specs:
+            client.post('/api/tickets',
+                        data=json.dumps({'title': title, 'description': 'd',
+                                         'due_date': due_date, 'status': status}),
+                        content_type='application/json')
+        return client
+    
+    def _titles(self, response):
+        assert response.status_code == 200
+        return [t['title'] for t in json.loads(response.data)]
+    
+    def test_filter_by_single_status(self, client_with_dated_tickets):
+        """Test filtering on one status."""
+        response = client_with_dated_tickets.get('/api/tickets?status=todo')
+        assert self._titles(response) == ['A', 'C']
+    
+    def test_filter_by_multiple_statuses(self, client_with_dated_tickets):
+        """Test comma-separated and repeated status parameters."""
+        comma = client_with_dated_tickets.get('/api/tickets?status=todo,review')
+        repeated = client_with_dated_tickets.get('/api/tickets?status=todo&status=review')
+        assert self._titles(comma) == ['A', 'C', 'E']
+        assert self._titles(repeated) == ['A', 'C', 'E']
+    
+    def test_filter_by_due_date_range(self, client_with_dated_tickets):
+        """Test inclusive due date bounds."""
+        response = client_with_dated_tickets.get('/api/tickets?due_from=2030-01-05&due_to=2030-01-20')
+        assert self._titles(response) == ['A', 'B', 'D', 'E']
+    
+    def test_filter_combines_status_and_due_date(self, client_with_dated_tickets):
+        """Test that status and due date filters intersect."""
+        response = client_with_dated_tickets.get('/api/tickets?status=todo&due_to=2030-01-31')
+        assert self._titles(response) == ['A']
+    
+    def test_filter_by_created_at_range(self, client_with_dated_tickets):
+        """Test created_at bounds, where a date bound covers the whole day."""
+        today = datetime.now().strftime('%Y-%m-%d')
+        tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+        
+        same_day = client_with_dated_tickets.get(f'/api/tickets?created_from={today}&created_to={today}')
+        future = client_with_dated_tickets.get(f'/api/tickets?created_from={tomorrow}')
+        
+        assert len(self._titles(same_day)) == 5
+        assert self._titles(future) == []
+    
+    def test_sort_by_due_date(self, client_with_dated_tickets):
+        """Test ascending and descending sort, with creation order breaking ties."""
+        ascending = client_with_dated_tickets.get('/api/tickets?sort=due_date')
+        descending = client_with_dated_tickets.get('/api/tickets?sort=-due_date')
+        assert self._titles(ascending) == ['B', 'E', 'A', 'D', 'C']
+        assert self._titles(descending) == ['C', 'D', 'A', 'E', 'B']
+    
+    def test_indexes_follow_updates_and_deletes(self, client_with_dated_tickets):
+        """Test that status and due date indexes are maintained on mutation."""
+        client = client_with_dated_tickets
+        tickets = json.loads(client.get('/api/tickets').data)
+        by_title = {t['title']: t['id'] for t in tickets}
+        
+        # Act
+        client.put(f"/api/tickets/{by_title['A']}",
+                   data=json.dumps({'status': 'review', 'due_date': '2030-03-01'}),
+                   content_type='application/json')
+        client.delete(f"/api/tickets/{by_title['C']}")
+        
+        # Assert
+        assert self._titles(client.get('/api/tickets?status=todo')) == []
+        assert self._titles(client.get('/api/tickets?status=review')) == ['A', 'E']
+        assert self._titles(client.get('/api/tickets?due_from=2030-02-01')) == ['A']
+    
+    def test_invalid_sort_field_rejected(self, client):
+        """Test that unknown sort fields return 400."""
+        response = client.get('/api/tickets?sort=-description')
+        assert response.status_code == 400
+        assert 'sort' in json.loads(response.data)['error']
+    
+    def test_invalid_date_rejected(self, client):
+        """Test that malformed date bounds return 400."""
+        response = client.get('/api/tickets?due_from=next-week')
+        assert response.status_code == 400
+        assert 'due_from' in json.loads(response.data)['error']
+
+
+class TestCursorPagination(TestConfig):
+    """
+    Tests for time-ordered ticket IDs and keyset pagination.
+    """
+    
+    @pytest.fixture
+    def client_with_many_tickets(self, client, sample_ticket_data):
+        """Create ten tickets alternating between two statuses."""
+        for i in range(10):
+            client.post('/api/tickets',
+                        data=json.dumps({**sample_ticket_data, 'title': f'T{i}',
+                                         'status': 'todo' if i % 2 == 0 else 'review'}),
+                        content_type='application/json')
+        return client
+    
+    def _walk(self, client, query):
+        """Follow X-Next-Cursor until the last page; return titles per page."""
+        pages = []
+        url = f'/api/tickets?{query}'
+        while True:
+            response = client.get(url)
+            assert response.status_code == 200
+            pages.append([t['title'] for t in json.loads(response.data)])
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                return pages
+            url = f'/api/tickets?{query}&after={cursor}'
+    
+    def test_new_ids_are_uuid7_in_creation_order(self):
+        """Test that generated IDs are version 7 UUIDs that sort by creation."""
+        import uuid
+        ids = [new_ticket_id() for _ in range(1000)]
+        assert all(uuid.UUID(i).version == 7 for i in ids)
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+    
+    def test_pages_cover_all_tickets_in_order(self, client_with_many_tickets):
+        """Test walking every page with a fixed limit."""
+        pages = self._walk(client_with_many_tickets, 'limit=4')
+        assert pages == [['T0', 'T1', 'T2', 'T3'], ['T4', 'T5', 'T6', 'T7'], ['T8', 'T9']]
+    
+    def test_pagination_descending(self, client_with_many_tickets):
+        """Test paging newest first."""
+        pages = self._walk(client_with_many_tickets, 'limit=4&sort=-created_at')
+        assert pages == [['T9', 'T8', 'T7', 'T6'], ['T5', 'T4', 'T3', 'T2'], ['T1', 'T0']]
+    
+    def test_pagination_with_status_filter(self, client_with_many_tickets):
+        """Test that filters apply within pages."""
+        pages = self._walk(client_with_many_tickets, 'limit=2&status=review')
+        assert pages == [['T1', 'T3'], ['T5', 'T7'], ['T9']]
+    
+    def test_exact_final_page_has_no_cursor(self, client_with_many_tickets):
+        """Test that a page ending on the last ticket does not advertise another."""
+        pages = self._walk(client_with_many_tickets, 'limit=5')
+        assert pages == [['T0', 'T1', 'T2', 'T3', 'T4'], ['T5', 'T6', 'T7', 'T8', 'T9']]
+    
+    def test_cursor_survives_deleting_its_ticket(self, client_with_many_tickets):
+        """Test that a cursor stays valid after the ticket it points at is deleted."""
+        client = client_with_many_tickets
+        first = client.get('/api/tickets?limit=3')
+        cursor = first.headers['X-Next-Cursor']
+        last_id = json.loads(first.data)[-1]['id']
+        
+        # Act
+        client.delete(f'/api/tickets/{last_id}')
+        response = client.get(f'/api/tickets?limit=3&after={cursor}')
+        
+        # Assert
+        assert [t['title'] for t in json.loads(response.data)] == ['T3', 'T4', 'T5']
+    
+    def test_legacy_uuid4_tickets_are_paged_by_created_at(self, tmp_path, monkeypatch):
+        """Test that existing random IDs are ordered by creation time."""
+        import uuid
+        data_file = tmp_path / "legacy.json"
+        legacy = [{'id': str(uuid.uuid4()), 'title': f'L{i}', 'description': 'd',
+                   'due_date': '2030-01-01', 'status': 'todo',
+                   'created_at': f'2025-01-0{9 - i}T10:00:00'} for i in range(3)]
+        with open(data_file, 'w') as f:
+            json.dump(legacy, f)
+        monkeypatch.setattr('app.DATA_FILE', str(data_file))
+        
+        with app.test_client() as client:
+            pages = self._walk(client, 'limit=2')
+        
+        assert pages == [['L2', 'L1'], ['L0']]
+    
+    @pytest.mark.parametrize('query', ['limit=0', 'limit=abc', 'limit=5000',
+                                       'limit=5&sort=due_date', 'after=not-a-cursor'])
+    def test_invalid_pagination_rejected(self, client, query):
+        """Test that bad pagination parameters return 400."""
+        response = client.get(f'/api/tickets?{query}')
+        assert response.status_code == 400
+        assert 'error' in json.loads(response.data)
+
+
+class TestConditionalRequests(TestConfig):
+    """
+    Tests for ETag / If-None-Match handling on ticket reads.
+    """
+    
+    def test_list_returns_etag_and_304_when_unchanged(self, client_with_tickets):
+        """Test that an unchanged list answers 304 with an empty body."""
+        client, _ = client_with_tickets
+        first = client.get('/api/tickets')
+        etag = first.headers['ETag']
+        
+        # Act
+        second = client.get('/api/tickets', headers={'If-None-Match': etag})
+        
+        # Assert
+        assert first.status_code == 200
+        assert second.status_code == 304
+        assert second.data == b''
+        assert second.headers['ETag'] == etag
+    
+    def test_mutation_changes_etag(self, client_with_tickets):
+        """Test that any write invalidates the previous ETag."""
+        client, tickets = client_with_tickets
+        etag = client.get('/api/tickets').headers['ETag']
+        
+        # Act
+        client.put(f"/api/tickets/{tickets[0]['id']}",
+                   data=json.dumps({'status': 'completed'}),
+                   content_type='application/json')
+        response = client.get('/api/tickets', headers={'If-None-Match': etag})
+        
+        # Assert
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+    
+    def test_filtered_list_supports_304(self, client_with_tickets):
+        """Test conditional requests on filtered and paged views."""
+        client, _ = client_with_tickets
+        for url in ('/api/tickets?status=todo', '/api/tickets?limit=2'):
+            etag = client.get(url).headers['ETag']
+            assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    
+    def test_get_ticket_supports_304(self, client_with_tickets):
+        """Test conditional requests on a single ticket."""
+        client, tickets = client_with_tickets
+        url = f"/api/tickets/{tickets[0]['id']}"
+        etag = client.get(url).headers['ETag']
+        
+        response = client.get(url, headers={'If-None-Match': etag})
+        
+        assert response.status_code == 304
+    
+    def test_store_version_is_monotonic(self, client_with_tickets):
+        """Test that the store version increases with every change."""
+        client, tickets = client_with_tickets
+        store = get_store()
+        before = store.version
+        
+        client.delete(f"/api/tickets/{tickets[0]['id']}")
+        
+        assert store.version == before + 1
+
+
+class TestDeltaSync(TestConfig):
+    """
+    Tests for GET /api/tickets/changes.
+    """
+    
+    def _version(self, response):
+        return response.headers['ETag'].strip('"')
+    
+    def test_changes_since_version(self, client_with_tickets, sample_ticket_data):
+        """Test that creates, updates and deletes since a version are returned."""
+        client, tickets = client_with_tickets
+        version = self._version(client.get('/api/tickets'))
+        
+        # Act
+        created = json.loads(client.post('/api/tickets',
+                                          data=json.dumps(sample_ticket_data),
+                                          content_type='application/json').data)
+        client.put(f"/api/tickets/{tickets[0]['id']}",
+                   data=json.dumps({'status': 'completed'}),
+                   content_type='application/json')
+        client.delete(f"/api/tickets/{tickets[1]['id']}")
+        response = client.get(f'/api/tickets/changes?since={version}')
+        
+        # Assert
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [(c['op'], c['id']) for c in data['changes']] == [
+            ('upsert', created['id']),
+            ('upsert', tickets[0]['id']),
+            ('delete', tickets[1]['id']),
+        ]
+        assert data['changes'][1]['ticket']['status'] == 'completed'
+        assert data['version'] != version
+    
+    def test_only_latest_change_per_ticket(self, client_with_tickets):
+        """Test that repeated changes to one ticket collapse to the last one."""
+        client, tickets = client_with_tickets
+        version = self._version(client.get('/api/tickets'))
+        ticket_id = tickets[0]['id']
+        
+        # Act
+        for status in ('review', 'completed'):
+            client.put(f'/api/tickets/{ticket_id}',
+                       data=json.dumps({'status': status}),
+                       content_type='application/json')
+        client.delete(f'/api/tickets/{ticket_id}')
+        data = json.loads(client.get(f'/api/tickets/changes?since={version}').data)
+        
+        # Assert
+        assert data['changes'] == [{'op': 'delete', 'id': ticket_id}]
+    
+    def test_no_changes_at_current_version(self, client_with_tickets):
+        """Test that an up-to-date client gets an empty change list."""
+        client, _ = client_with_tickets
+        version = self._version(client.get('/api/tickets'))
+        
+        data = json.loads(client.get(f'/api/tickets/changes?since={version}').data)
+        
+        assert data == {'version': version, 'changes': []}
+    
+    def test_resync_when_cursor_falls_off_log(self, client_with_tickets, monkeypatch):
+        """Test that versions older than the bounded log require a resync."""
+        client, tickets = client_with_tickets
+        monkeypatch.setattr('app.CHANGE_LOG_SIZE', 2)
+        version = self._version(client.get('/api/tickets'))
+        
+        # Act
+        for ticket in tickets[:3]:
+            client.put(f"/api/tickets/{ticket['id']}",
+                       data=json.dumps({'status': 'completed'}),
+                       content_type='application/json')
+        response = client.get(f'/api/tickets/changes?since={version}')
+        
+        # Assert
+        assert response.status_code == 410
+        data = json.loads(response.data)
+        assert data['resync'] is True
+        assert data['version'] == get_store().etag
+    
+    def test_resync_for_other_epoch(self, client):
+        """Test that versions from another process or run require a resync."""
+        response = client.get('/api/tickets/changes?since=deadbeef-0')
+        assert response.status_code == 410
+    
+    def test_resync_after_full_reload(self, client_with_tickets):
+        """Test that an external rewrite of the data file invalidates old versions."""
+        client, _ = client_with_tickets
+        version = self._version(client.get('/api/tickets'))
+        
+        # Act: Another writer replaces the whole file
+        save_tickets([])
+        response = client.get(f'/api/tickets/changes?since={version}')
+        
+        # Assert
+        assert response.status_code == 410
+    
+    def test_invalid_since_rejected(self, client):
+        """Test that a malformed version returns 400."""
+        assert client.get('/api/tickets/changes').status_code == 400
+        assert client.get('/api/tickets/changes?since=abc').status_code == 400
+
+
+class TestEventStream(TestConfig):
+    """
+    Tests for the Server-Sent Events change stream.
+    """
+    
+    @pytest.fixture(autouse=True)
+    def fast_stream(self, monkeypatch):
+        monkeypatch.setattr('app.SSE_POLL_INTERVAL', 0.01)
+    
+    def _open(self, client, url='/api/tickets/events', **kwargs):
+        response = client.get(url, buffered=False, **kwargs)
+        return response, response.iter_encoded()
+    
+    def _event(self, chunk):
+        fields = dict(line.split(': ', 1) for line in chunk.decode().strip().split('\n'))
+        return fields['event'], fields['id'], json.loads(fields['data'])
+    
+    def test_stream_pushes_changes(self, client, sample_ticket_data):
+        """Test that a subscriber receives a created ticket."""
+        response, events = self._open(client)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        assert next(events) == b'retry: 3000\n\n'
+        
+        # Act
+        created = json.loads(client.post('/api/tickets',
+                                          data=json.dumps(sample_ticket_data),
+                                          content_type='application/json').data)
+        event, event_id, data = self._event(next(events))
+        response.close()
+        
+        # Assert
+        assert event == 'changes'
+        assert event_id == data['version'] == get_store().etag
+        assert data['changes'] == [{'op': 'upsert', 'id': created['id'], 'ticket': created}]
+    
+    def test_streams_end_on_shutdown(self, client, monkeypatch):
+        """Test that end_event_streams() lets open streams finish."""
+        import app as app_module
+        import threading
+        monkeypatch.setattr('app._sse_ending', threading.Event())
+        response, events = self._open(client)
+        next(events)
+        
+        # Act
+        app_module.end_event_streams()
+        
+        # Assert
+        assert list(events) == []
+        response.close()
+    
+    def test_reconnect_resumes_from_last_event_id(self, client_with_tickets):
+        """Test that Last-Event-ID replays changes missed while disconnected."""
+        client, tickets = client_with_tickets
+        version = get_store().etag
+        client.delete(f"/api/tickets/{tickets[0]['id']}")
+        
+        # Act
+        response, events = self._open(client, headers={'Last-Event-ID': version})
+        next(events)
+        event, _, data = self._event(next(events))
+        response.close()
+        
+        # Assert
+        assert event == 'changes'
+        assert data['changes'] == [{'op': 'delete', 'id': tickets[0]['id']}]
+    
+    def test_unknown_version_requests_resync(self, client):
+        """Test that a version from another epoch produces a resync event."""
+        response, events = self._open(client, '/api/tickets/events?since=00000000-5')
+        next(events)
+        event, event_id, _ = self._event(next(events))
+        response.close()
+        
+        assert event == 'resync'
+        assert event_id == get_store().etag
+    
+    def test_heartbeat_when_idle(self, client, monkeypatch):
+        """Test that idle streams send keep-alive comments."""
+        monkeypatch.setattr('app.SSE_HEARTBEAT', 0)
+        response, events = self._open(client)
+        next(events)
+        
+        assert next(events) == b': keep-alive\n\n'
+        response.close()
+    
+    def test_subscriber_cap(self, client, monkeypatch):
+        """Test that streams beyond the per-worker cap are refused and slots are released."""
+        import app as app_module
+        monkeypatch.setattr('app.SSE_MAX_SUBSCRIBERS', 1)
+        first, _ = self._open(client)
+        
+        # Act
+        refused = client.get('/api/tickets/events')
+        first.close()
+        
+        # Assert
+        assert refused.status_code == 503
+        assert 'Retry-After' in refused.headers
+        assert app_module._sse_subscribers == 0
+    
+    def test_invalid_version_rejected(self, client):
+        """Test that a malformed since parameter returns 400."""
+        response = client.get('/api/tickets/events?since=bogus')
+        assert response.status_code == 400
+
+
+class TestBatchOperations(TestConfig):
+    """
+    Tests for POST /api/tickets/batch.
+    """
+    
+    def _batch(self, client, operations):
+        return client.post('/api/tickets/batch',
+                           data=json.dumps(operations),
+                           content_type='application/json')
+    
+    def test_mixed_batch_applies_in_order(self, client_with_tickets, sample_ticket_data):
+        """Test create, update and delete in one request with per-item results."""
+        client, tickets = client_with_tickets
+        
+        # Act
+        response = self._batch(client, [
+            {'op': 'create', 'data': {**sample_ticket_data, 'title': 'Imported'}},
+            {'op': 'update', 'id': tickets[0]['id'], 'data': {'status': 'completed'}},
+            {'op': 'delete', 'id': tickets[1]['id']},
+        ])
+        
+        # Assert
+        assert response.status_code == 200
+        results = json.loads(response.data)['results']
+        assert [r['status'] for r in results] == [201, 200, 200]
+        assert results[0]['ticket']['title'] == 'Imported'
+        assert results[1]['ticket']['status'] == 'completed'
+        assert results[2]['ticket']['id'] == tickets[1]['id']
+        stored = {t['id']: t for t in load_tickets()}
+        assert results[0]['ticket']['id'] in stored
+        assert stored[tickets[0]['id']]['status'] == 'completed'
+        assert tickets[1]['id'] not in stored
+    
+    def test_batch_persists_once(self, client, sample_ticket_data, monkeypatch):
+        """Test that a large batch is written to disk in a single save."""
+        import app as app_module
+        saves = []
+        real_save = app_module.save_tickets
+        monkeypatch.setattr('app.save_tickets', lambda tickets, path=None: saves.append(len(tickets)) or real_save(tickets, path))
+        
+        # Act
+        response = self._batch(client, [{'op': 'create', 'data': {**sample_ticket_data, 'title': f'T{i}'}}
+                                        for i in range(200)])
+        
+        # Assert
+        assert response.status_code == 200
+        assert saves == [200]
+        assert len(json.loads(client.get('/api/tickets').data)) == 200
+    
+    def test_invalid_items_reported_without_failing_batch(self, client_with_tickets, sample_ticket_data):
+        """Test that validation uses the single-ticket rules per item."""
+        client, tickets = client_with_tickets
+        
+        # Act
+        response = self._batch(client, [
+            {'op': 'create', 'data': {'title': 'No description', 'due_date': '2030-01-01'}},
+            {'op': 'update', 'id': tickets[0]['id'], 'data': {}},
+            {'op': 'delete', 'id': 'does-not-exist'},
+            {'op': 'archive', 'id': tickets[0]['id']},
+            {'op': 'update', 'data': {'status': 'review'}},
+            'not an object',
+            {'op': 'create', 'data': sample_ticket_data},
+        ])
+        
+        # Assert
+        results = json.loads(response.data)['results']
+        assert [r['status'] for r in results] == [400, 400, 404, 400, 400, 400, 201]
+        assert 'description' in results[0]['error']
+        assert results[1]['error'] == 'No data provided'
+        assert len(load_tickets()) == 5
+    
+    def test_later_operations_see_earlier_ones(self, client_with_tickets):
+        """Test that operations on the same ticket compose within a batch."""
+        client, tickets = client_with_tickets
+        ticket_id = tickets[0]['id']
+        
+        response = self._batch(client, [
+            {'op': 'update', 'id': ticket_id, 'data': {'status': 'review'}},
+            {'op': 'update', 'id': ticket_id, 'data': {'title': 'Renamed'}},
+            {'op': 'delete', 'id': ticket_id},
+            {'op': 'update', 'id': ticket_id, 'data': {'status': 'todo'}},
+        ])
+        
+        results = json.loads(response.data)['results']
+        assert [r['status'] for r in results] == [200, 200, 200, 404]
+        assert results[2]['ticket']['title'] == 'Renamed'
+        assert results[2]['ticket']['status'] == 'review'
+    
+    def test_ndjson_body(self, client, sample_ticket_data):
+        """Test one operation per line with a malformed line in between."""
+        body = '\n'.join([
+            json.dumps({'op': 'create', 'data': sample_ticket_data}),
+            '{broken',
+            '',
+            json.dumps({'op': 'create', 'data': sample_ticket_data}),
+        ])
+        
+        response = client.post('/api/tickets/batch', data=body, content_type='application/x-ndjson')
+        
+        results = json.loads(response.data)['results']
+        assert [r['status'] for r in results] == [201, 400, 201]
+    
+    def test_batch_in_journal_mode(self, client, sample_ticket_data, monkeypatch):
+        """Test that a batch appends all of its records in journal mode."""
+        import app as app_module
+        monkeypatch.setattr('app.JOURNAL_ENABLED', True)
+        
+        self._batch(client, [{'op': 'create', 'data': sample_ticket_data} for _ in range(3)])
+        
+        with open(app_module.DATA_FILE + '.journal') as f:
+            assert len(f.readlines()) == 3
+    
+    @pytest.mark.parametrize('body', ['{}', '[]', 'not json'])
+    def test_malformed_batch_rejected(self, client, body):
+        """Test that a body that is not a list of operations returns 400."""
+        response = client.post('/api/tickets/batch', data=body, content_type='application/json')
+        assert response.status_code == 400
+    
+    def test_batch_size_limit(self, client, sample_ticket_data, monkeypatch):
+        """Test that oversized batches are refused."""
+        monkeypatch.setattr('app.BATCH_MAX_OPERATIONS', 2)
+        response = self._batch(client, [{'op': 'create', 'data': sample_ticket_data}] * 3)
+        assert response.status_code == 400
+
+
+class TestStreamingExport(TestConfig):
+    """
+    Tests for GET /api/tickets/export.
+    """
+    
+    def test_ndjson_export(self, client_with_tickets):
+        """Test that every ticket is exported as one JSON line."""
+        client, tickets = client_with_tickets
+        
+        response = client.get('/api/tickets/export')
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert 'tickets.ndjson' in response.headers['Content-Disposition']
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line) for line in lines] == tickets
+    
+    def test_csv_export(self, client_with_tickets):
+        """Test CSV export with a header row and escaped values."""
+        import csv
+        import io
+        client, tickets = client_with_tickets
+        client.put(f"/api/tickets/{tickets[0]['id']}",
+                   data=json.dumps({'title': 'Comma, "quoted"\nand newline'}),
+                   content_type='application/json')
+        
+        response = client.get('/api/tickets/export?format=csv')
+        
+        assert response.mimetype == 'text/csv'
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert [r['id'] for r in rows] == [t['id'] for t in tickets]
+        assert rows[0]['title'] == 'Comma, "quoted"\nand newline'
+        assert rows[1]['updated_at'] == ''
+    
+    def test_export_applies_list_filters(self, client_with_tickets):
+        """Test that export accepts the list endpoint's filters and sort."""
+        client, _ = client_with_tickets
+        
+        response = client.get('/api/tickets/export?status=todo,review&sort=-status')
+        
+        statuses = [json.loads(line)['status'] for line in response.get_data(as_text=True).splitlines()]
+        assert statuses == ['todo', 'review']
+    
+    def test_export_streams_in_chunks(self, client, sample_ticket_data, monkeypatch):
+        """Test that the body is produced incrementally, first line first."""
+        monkeypatch.setattr('app.EXPORT_CHUNK_SIZE', 512)
+        client.post('/api/tickets/batch',
+                    data=json.dumps([{'op': 'create', 'data': sample_ticket_data}] * 50),
+                    content_type='application/json')
+        
+        response = client.get('/api/tickets/export', buffered=False)
+        chunks = list(response.iter_encoded())
+        
+        assert len(chunks) > 5
+        assert chunks[0].count(b'\n') == 1
+        assert sum(chunk.count(b'\n') for chunk in chunks) == 50
+    
+    def test_empty_csv_export_has_header(self, client):
+        """Test that an empty CSV export still has its header."""
+        response = client.get('/api/tickets/export?format=csv')
+        assert response.get_data(as_text=True).strip() == 'id,title,description,due_date,status,created_at,updated_at'
+    
+    def test_invalid_export_requests_rejected(self, client):
+        """Test unknown formats and bad filters."""
+        assert client.get('/api/tickets/export?format=xml').status_code == 400
+        assert client.get('/api/tickets/export?due_from=soon').status_code == 400
+
+
+class TestTicketRecord(TestConfig):
+    """
+    Tests for the compact Ticket record used inside the store.
+    """
+    
+    def test_round_trip_keeps_fields_and_extras(self):
+        """Test that to_dict() returns exactly the fields the ticket had."""
+        data = {'id': 't1', 'title': 'T', 'description': 'd', 'status': 'todo', 'priority': 'high'}
+        
+        # Act
+        ticket = Ticket.from_dict(data)
+        
+        # Assert
+        assert ticket.to_dict() == data
+        assert ticket['priority'] == 'high'
+        assert ticket.get('updated_at') is None
+        assert 'updated_at' not in ticket
+        with pytest.raises(KeyError):
+            ticket['updated_at']
+    
+    def test_status_and_due_date_are_shared(self):
+        """Test that equal status and due date values are stored once."""
+        first, second = (Ticket.from_dict(t) for t in json.loads(
+            '[{"id": "a", "status": "in-progress", "due_date": "2030-01-01"},'
+            ' {"id": "b", "status": "in-progress", "due_date": "2030-01-01"}]'))
+        
+        assert first.status is second.status
+        assert first.due_date is second.due_date
+    
+    def test_long_description_is_compressed_until_read(self, client, sample_ticket_data):
+        """Test that long descriptions are held compressed and served in full."""
+        description = 'Steps to reproduce the login failure. ' * 50
+        created = json.loads(client.post('/api/tickets', data=json.dumps({**sample_ticket_data, 'description': description}),
+                                         content_type='application/json').data)
+        
+        # Act
+        ticket = get_store().get(created['id'])
+        
+        # Assert
+        assert isinstance(ticket._description, bytes)
+        assert len(ticket._description) < len(description)
+        assert ticket.description == description
+        assert json.loads(client.get(f"/api/tickets/{created['id']}").data)['description'] == description
+    
+    def test_updates_replace_records(self, client_with_tickets):
+        """Test that an update stores a new record and leaves the old one intact."""
+        client, tickets = client_with_tickets
+        before = get_store().get(tickets[0]['id'])
+        
+        # Act
+        client.put(f"/api/tickets/{tickets[0]['id']}", data=json.dumps({'status': 'completed'}),
+                   content_type='application/json')
+        
+        # Assert
+        after = get_store().get(tickets[0]['id'])
+        assert isinstance(after, Ticket)
+        assert before['status'] == 'todo'
+        assert after['status'] == 'completed'
+        assert after.to_dict() == {**before.to_dict(), 'status': 'completed', 'updated_at': after['updated_at']}
+    
+    def test_records_persist_as_plain_json(self, client_with_tickets):
+        """Test that the data file holds ordinary ticket objects."""
+        client, tickets = client_with_tickets
+        
+        stored = load_tickets()
+        
+        assert stored == tickets
+        assert stored == get_store().all()
+
+
+class TestTicketStats(TestConfig):
+    """
+    Tests for GET /api/tickets/stats.
+    """
+    
+    def _create(self, client, sample_ticket_data, days, status='todo'):
+        due = (datetime.now() + timedelta(days=days)).strftime('%Y-%m-%d')
+        response = client.post('/api/tickets', data=json.dumps({**sample_ticket_data, 'due_date': due, 'status': status}),
+                               content_type='application/json')
+        return json.loads(response.data)
+    
+    def test_counts_per_status(self, client_with_tickets):
+        """Test that every status is counted."""
+        client, _ = client_with_tickets
+        
+        # Act
+        stats = json.loads(client.get('/api/tickets/stats').data)
+        
+        # Assert
+        assert stats['total'] == 4
+        assert stats['by_status'] == {'todo': 1, 'in-progress': 1, 'review': 1, 'completed': 1}
+        assert stats['version'] == get_store().etag
+    
+    def test_overdue_and_due_this_week(self, client, sample_ticket_data):
+        """Test the due date windows and that completed tickets are left out."""
+        self._create(client, sample_ticket_data, -1)
+        self._create(client, sample_ticket_data, -1, status='completed')
+        self._create(client, sample_ticket_data, 0)
+        self._create(client, sample_ticket_data, 6, status='review')
+        self._create(client, sample_ticket_data, 7)
+        
+        # Act
+        stats = json.loads(client.get('/api/tickets/stats').data)
+        
+        # Assert
+        assert stats['overdue'] == 1
+        assert stats['due_this_week'] == 2
+    
+    def test_counters_follow_updates_and_deletes(self, client, sample_ticket_data):
+        """Test that completing or deleting tickets updates the counters."""
+        late = self._create(client, sample_ticket_data, -3)
+        soon = self._create(client, sample_ticket_data, 2)
+        
+        # Act
+        client.put(f"/api/tickets/{late['id']}", data=json.dumps({'status': 'completed'}),
+                   content_type='application/json')
+        client.put(f"/api/tickets/{soon['id']}", data=json.dumps({'due_date': '2000-01-01'}),
+                   content_type='application/json')
+        after_update = json.loads(client.get('/api/tickets/stats').data)
+        client.delete(f"/api/tickets/{soon['id']}")
+        after_delete = json.loads(client.get('/api/tickets/stats').data)
+        
+        # Assert
+        assert (after_update['overdue'], after_update['due_this_week']) == (1, 0)
+        assert after_update['by_status'] == {'todo': 1, 'completed': 1}
+        assert (after_delete['overdue'], after_delete['due_this_week']) == (0, 0)
+        assert after_delete['by_status'] == {'completed': 1}
+    
+    def test_windows_move_with_the_date(self, client, sample_ticket_data):
+        """Test that counts are relative to the day they are asked for."""
+        self._create(client, sample_ticket_data, 3)
+        later = datetime.now().date() + timedelta(days=5)
+        
+        # Act
+        stats = get_store().stats(today=later)
+        
+        # Assert
+        assert stats['overdue'] == 1
+        assert stats['due_this_week'] == 0
+
+
+class TestTicketSearch(TestConfig):
+    """
+    Tests for GET /api/tickets/search.
+    """
+    
+    def _create(self, client, title, description):
+        response = client.post('/api/tickets', data=json.dumps({'title': title, 'description': description,
+                                                                'due_date': '2030-01-01'}),
+                               content_type='application/json')
+        return json.loads(response.data)
+    
+    def _search(self, client, query, **params):
+        response = client.get('/api/tickets/search', query_string={'q': query, **params})
+        return [t['title'] for t in json.loads(response.data)]
+    
+    def test_matches_title_and_description_words(self, client):
+        """Test that words are found in either field, case-insensitively."""
+        self._create(client, 'Login fails', 'Password with symbols')
+        self._create(client, 'Slow export', 'CSV download times out')
+        
+        # Act / Assert
+        assert self._search(client, 'LOGIN') == ['Login fails']
+        assert self._search(client, 'download') == ['Slow export']
+        assert self._search(client, 'nothing') == []
+    
+    def test_title_matches_rank_first(self, client):
+        """Test that a title occurrence outweighs a description occurrence."""
+        self._create(client, 'Dashboard layout', 'Broken on login page')
+        self._create(client, 'Login page broken', 'Layout shifts')
+        
+        assert self._search(client, 'login') == ['Login page broken', 'Dashboard layout']
+    
+    def test_prefix_and_all_words_required(self, client):
+        """Test prefix matching of partial words and AND semantics across words."""
+        self._create(client, 'Login fails', 'Password reset')
+        self._create(client, 'Logout button', 'Password change')
+        
+        # Act / Assert
+        assert sorted(self._search(client, 'log')) == ['Login fails', 'Logout button']
+        assert self._search(client, 'log reset') == ['Login fails']
+        assert self._search(client, 'l') == []
+    
+    def test_index_follows_updates_and_deletes(self, client):
+        """Test that edits and deletions update the index without a rebuild."""
+        ticket = self._create(client, 'Login fails', 'Password reset')
+        other = self._create(client, 'Export slow', 'CSV')
+        
+        # Act
+        client.put(f"/api/tickets/{ticket['id']}", data=json.dumps({'title': 'Signin fails'}),
+                   content_type='application/json')
+        client.put(f"/api/tickets/{ticket['id']}", data=json.dumps({'status': 'review'}),
+                   content_type='application/json')
+        client.delete(f"/api/tickets/{other['id']}")
+        
+        # Assert
+        assert self._search(client, 'login') == []
+        assert self._search(client, 'signin') == ['Signin fails']
+        assert self._search(client, 'export') == []
+        assert 'export' not in get_store()._vocab
+    
+    def test_limit(self, client):
+        """Test that limit caps the results and is validated."""
+        for i in range(5):
+            self._create(client, f'Crash {i}', 'Stack trace')
+        
+        # Act / Assert
+        assert len(self._search(client, 'crash', limit=2)) == 2
+        assert len(self._search(client, 'crash')) == 5
+        assert client.get('/api/tickets/search?q=crash&limit=0').status_code == 400
+        assert client.get('/api/tickets/search?q=crash&limit=x').status_code == 400
+        assert client.get('/api/tickets/search').status_code == 400
+
+
+class TestGroupCommit(TestConfig):
+    """
+    Tests for the group-commit write path.
+    """
+    
+    @pytest.fixture
+    def store(self, tmp_path, monkeypatch):
+        data_file = str(tmp_path / "group.json")
+        monkeypatch.setattr('app.DATA_FILE', data_file)
+        store = TicketStore(data_file, group_commit=True)
+        store.load()
+        yield store
+        store.close()
+    
+    def _concurrently(self, *calls):
+        import threading
+        results = [None] * len(calls)
+        
+        def run(index, call):
+            try:
+                results[index] = call()
+            except Exception as e:
+                results[index] = e
+        
+        threads = [threading.Thread(target=run, args=(i, call)) for i, call in enumerate(calls)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        return results
+    
+    def test_concurrent_writes_share_one_save(self, store, monkeypatch):
+        """Test that writes queued while the writer waits are saved together."""
+        import app as app_module
+        saves = []
+        real_save = app_module.save_tickets
+        monkeypatch.setattr('app.save_tickets', lambda tickets, path=None: saves.append(len(tickets)) or real_save(tickets, path))
+        monkeypatch.setattr('app.GROUP_COMMIT_INTERVAL', 0.2)
+        
+        # Act
+        results = self._concurrently(*[lambda i=i: store.add(self._ticket(f't{i}')) for i in range(8)])
+        
+        # Assert
+        assert [r['id'] for r in results] == [f't{i}' for i in range(8)]
+        assert len(saves) < 8
+        assert sorted(t['id'] for t in load_tickets()) == [f't{i}' for i in range(8)]
+    
+    def test_each_request_gets_its_own_result(self, store, monkeypatch):
+        """Test that results are handed back per request within a group."""
+        store.add(self._ticket('t1'))
+        monkeypatch.setattr('app.GROUP_COMMIT_INTERVAL', 0.1)
+        
+        # Act
+        updated, missing, deleted = self._concurrently(
+            lambda: store.update('t1', {'status': 'review'}),
+            lambda: store.delete('nope'),
+            lambda: store.apply_batch([('add', 't2', self._ticket('t2')), ('delete', 't2', None)]),
+        )
+        
+        # Assert
+        assert updated['status'] == 'review'
+        assert missing is None
+        assert [t['id'] for t in deleted] == ['t2', 't2']
+        assert [t['id'] for t in store.all()] == ['t1']
+    
+    def test_failed_commit_fails_every_waiter(self, store, monkeypatch):
+        """Test that a failed write is reported to all requests and nothing is applied."""
+        def fail(tickets, path=None):
+            raise OSError('disk full')
+        monkeypatch.setattr('app.save_tickets', fail)
+        monkeypatch.setattr('app.GROUP_COMMIT_INTERVAL', 0.1)
+        
+        # Act
+        results = self._concurrently(lambda: store.add(self._ticket('t1')),
+                                     lambda: store.add(self._ticket('t2')))
+        
+        # Assert
+        assert all(isinstance(r, OSError) for r in results)
+        assert len(store) == 0
+    
+    def test_close_commits_queued_writes(self, store):
+        """Test that writes still work, synchronously, after the writer has stopped."""
+        store.add(self._ticket('t1'))
+        
+        # Act
+        store.close()
+        store.add(self._ticket('t2'))
+        
+        # Assert
+        assert [t['id'] for t in load_tickets()] == ['t1', 't2']
+    
+    @pytest.mark.parametrize('enabled', [True, False])
+    def test_fsync_policy(self, store, monkeypatch, enabled):
+        """Test that commits are fsynced unless TICKETS_FSYNC is off."""
+        synced = []
+        monkeypatch.setattr('app.FSYNC_ENABLED', enabled)
+        monkeypatch.setattr('os.fsync', synced.append)
+        
+        # Act
+        store.add(self._ticket('t1'))
+        
+        # Assert
+        assert bool(synced) is enabled
+        assert [t['id'] for t in load_tickets()] == ['t1']
+    
+    def test_api_store_uses_group_commit(self, client):
+        """Test that the process-wide store commits through the writer thread."""
+        assert get_store().group_commit is True
+
+
+class TestStaticPageCache(TestConfig):
+    """
+    Tests for HTML pages served from memory with precompressed variants.
+    """
+    
+    def test_pages_are_served_without_touching_disk(self, client, monkeypatch):
+        """Test that preloaded pages do not go through send_from_directory."""
+        monkeypatch.setattr('app.send_from_directory', lambda *args: pytest.fail('read from disk'))
+        
+        # Act
+        response = client.get('/board.html')
+        
+        # Assert
+        assert response.status_code == 200
+        assert response.mimetype == 'text/html'
+        assert b'Ticket Board' in response.data
+        assert response.headers['Cache-Control'] == 'public, max-age=300'
+        assert response.headers['Vary'] == 'Accept-Encoding'
+    
+    def test_gzip_variant_negotiated(self, client):
+        """Test that gzip is sent to clients that accept it, with its own ETag."""
+        import gzip
+        plain = client.get('/')
+        
+        # Act
+        response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+        
+        # Assert
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.data) == plain.data
+        assert response.headers['ETag'] != plain.headers['ETag']
+        assert 'Content-Encoding' not in plain.headers
+    
+    def test_brotli_preferred_when_available(self, client):
+        """Test that brotli wins over gzip when both are accepted."""
+        brotli = pytest.importorskip('brotli')
+        plain = client.get('/index.html')
+        
+        # Act
+        response = client.get('/index.html', headers={'Accept-Encoding': 'gzip, deflate, br'})
+        refused = client.get('/index.html', headers={'Accept-Encoding': 'br;q=0, gzip'})
+        
+        # Assert
+        assert response.headers['Content-Encoding'] == 'br'
+        assert brotli.decompress(response.data) == plain.data
+        assert refused.headers['Content-Encoding'] == 'gzip'
+    
+    def test_strong_etag_revalidation(self, client):
+        """Test that a matching If-None-Match gets 304 for the same variant only."""
+        etag = client.get('/', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+        assert not etag.startswith('W/')
+        
+        # Act
+        cached = client.get('/', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        other_variant = client.get('/', headers={'If-None-Match': etag})
+        
+        # Assert
+        assert cached.status_code == 304
+        assert cached.data == b''
+        assert other_variant.status_code == 200
+    
+    def test_missing_page_falls_back_to_disk(self, client, monkeypatch):
+        """Test that a page that was not preloaded is still served from disk."""
+        monkeypatch.setattr('app._static_pages', {})
+        
+        response = client.get('/index.html')
+        
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+
+
+class TestResponseCompression(TestConfig):
+    """
+    Tests for negotiated compression of API responses.
+    """
+    
+    @pytest.fixture
+    def api(self, client_with_tickets, monkeypatch):
+        """Compress anything over 100 bytes, with an empty response cache."""
+        import app as app_module
+        monkeypatch.setattr('app.COMPRESS_MIN_SIZE', 100)
+        monkeypatch.setattr('app._response_cache', app_module.ResponseCache(1024 * 1024))
+        return client_with_tickets[0]
+    
+    def test_list_gzipped_with_weak_etag(self, api):
+        """Test that a large list is gzipped and tagged with a weak ETag."""
+        import gzip
+        plain = api.get('/api/tickets')
+        
+        # Act
+        response = api.get('/api/tickets', headers={'Accept-Encoding': 'gzip'})
+        
+        # Assert
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        assert gzip.decompress(response.data) == plain.data
+        assert response.headers['ETag'] == 'W/' + plain.headers['ETag']
+        assert 'Content-Encoding' not in plain.headers
+    
+    def test_weak_etag_revalidates(self, api):
+        """Test that the weak tag still yields 304 and delta responses."""
+        etag = api.get('/api/tickets', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+        
+        # Act
+        cached = api.get('/api/tickets', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        delta = api.get('/api/tickets/changes', query_string={'since': etag})
+        
+        # Assert
+        assert cached.status_code == 304
+        assert delta.status_code == 200
+        assert delta.get_json()['changes'] == []
+    
+    def test_small_and_streamed_responses_sent_as_is(self, api, monkeypatch):
+        """Test that small bodies and streamed exports are not compressed."""
+        monkeypatch.setattr('app.COMPRESS_MIN_SIZE', 100000)
+        
+        small = api.get('/api/tickets', headers={'Accept-Encoding': 'gzip'})
+        export = api.get('/api/tickets/export', headers={'Accept-Encoding': 'gzip'})
+        
+        assert 'Content-Encoding' not in small.headers
+        assert small.headers['Vary'] == 'Accept-Encoding'
+        assert 'Content-Encoding' not in export.headers
+    
+    def test_compressed_list_cached_per_version(self, api, sample_ticket_data, monkeypatch):
+        """Test that polling an unchanged list compresses it only once."""
+        import app as app_module
+        compress, calls = app_module.compress, []
+        
+        def counting_compress(data, encoding, level=None):
+            calls.append(level)
+            return compress(data, encoding, level)
+        
+        monkeypatch.setattr('app.compress', counting_compress)
+        monkeypatch.setattr('app.COMPRESS_LEVEL', 1)
+        headers = {'Accept-Encoding': 'gzip'}
+        
+        # Act
+        first = api.get('/api/tickets', headers=headers)
+        second = api.get('/api/tickets', headers=headers)
+        api.post('/api/tickets', json=sample_ticket_data)
+        third = api.get('/api/tickets', headers=headers)
+        
+        # Assert
+        assert second.data == first.data
+        assert third.data != first.data
+        assert calls == [1, 1]
+    
+    def test_brotli_quality_configurable(self, api, monkeypatch):
+        """Test that brotli is used at BROTLI_QUALITY when accepted."""
+        brotli = pytest.importorskip('brotli')
+        monkeypatch.setattr('app.BROTLI_QUALITY', 1)
+        plain = api.get('/api/tickets')
+        
+        response = api.get('/api/tickets', headers={'Accept-Encoding': 'gzip, br'})
+        
+        assert response.headers['Content-Encoding'] == 'br'
+        assert response.data == brotli.compress(plain.data, quality=1)
+    
+    def test_response_cache_evicts_least_recently_used(self):
+        """Test that the cache stays within its byte budget."""
+        from app import ResponseCache
+        cache = ResponseCache(10)
+        cache.put('a', b'1234')
+        cache.put('b', b'1234')
+        cache.get('a')
+        
+        # Act
+        cache.put('c', b'1234')
+        cache.put('huge', b'x' * 11)
+        
+        # Assert
+        assert cache.get('a') == b'1234'
+        assert cache.get('b') is None
+        assert cache.get('c') == b'1234'
+        assert cache.get('huge') is None
+
+
+class TestListResponseCache(TestConfig):
+    """
+    Tests for the per-version cache of encoded list responses.
+    """
+    
+    @pytest.fixture
+    def api(self, client_with_tickets, monkeypatch):
+        """A client with tickets, an empty response cache and counted serialization."""
+        import app as app_module
+        monkeypatch.setattr('app._response_cache', app_module.ResponseCache(1024 * 1024))
+        jsonify, calls = app_module.jsonify, []
+        
+        def counting_jsonify(*args, **kwargs):
+            calls.append(args)
+            return jsonify(*args, **kwargs)
+        
+        monkeypatch.setattr('app.jsonify', counting_jsonify)
+        return client_with_tickets[0], calls
+    
+    def test_repeated_polls_served_from_cache(self, api):
+        """Test that an unchanged list is serialized once per URL."""
+        client, calls = api
+        
+        # Act
+        first = client.get('/api/tickets')
+        second = client.get('/api/tickets')
+        filtered = [client.get('/api/tickets?status=todo,review') for _ in range(2)]
+        
+        # Assert
+        assert len(calls) == 2
+        assert second.data == first.data
+        assert second.headers['ETag'] == first.headers['ETag']
+        assert second.mimetype == 'application/json'
+        assert [t['status'] for t in filtered[1].get_json()] == ['todo', 'review']
+    
+    def test_mutation_invalidates_cached_list(self, api, sample_ticket_data):
+        """Test that a write is visible on the next poll."""
+        client, _ = api
+        before = client.get('/api/tickets').get_json()
+        
+        # Act
+        client.post('/api/tickets', json=sample_ticket_data)
+        after = client.get('/api/tickets')
+        
+        # Assert
+        assert len(after.get_json()) == len(before) + 1
+    
+    def test_pages_and_errors_not_cached(self, api):
+        """Test that paged responses keep their cursor and errors are not cached."""
+        client, calls = api
+        
+        # Act
+        pages = [client.get('/api/tickets?limit=2') for _ in range(2)]
+        errors = [client.get('/api/tickets?due_from=someday') for _ in range(2)]
+        
+        # Assert
+        assert len(calls) == 4
+        assert pages[1].headers['X-Next-Cursor'] == pages[0].headers['X-Next-Cursor']
+        assert errors[1].status_code == 400
+
+
+class TestMetrics(TestConfig):
+    """
+    Tests for the Prometheus metrics endpoint.
+    """
+    
+    @pytest.fixture
+    def metrics(self, client, monkeypatch):
+        """A client with fresh metrics; returns a function scraping /metrics."""
+        from collections import Counter
+        monkeypatch.setattr('app._request_counts', Counter())
+        monkeypatch.setattr('app._request_latency', {})
+        monkeypatch.setattr('app._storage_latency', {})
+        
+        def scrape():
+            response = client.get('/metrics')
+            assert response.status_code == 200
+            assert response.mimetype == 'text/plain'
+            return response.get_data(as_text=True).splitlines()
+        
+        return client, scrape
+    
+    def test_requests_counted_per_route(self, metrics, sample_ticket_data):
+        """Test request counts and latency histograms labelled by route template."""
+        client, scrape = metrics
+        ticket = client.post('/api/tickets', json=sample_ticket_data).get_json()
+        client.get(f"/api/tickets/{ticket['id']}")
+        client.get('/api/tickets/missing')
+        client.get('/no-such-page')
+        
+        # Act
+        lines = scrape()
+        
+        # Assert
+        assert 'tickets_http_requests_total{method="POST",route="/api/tickets",status="201"} 1' in lines
+        assert 'tickets_http_requests_total{method="GET",route="/api/tickets/<ticket_id>",status="200"} 1' in lines
+        assert 'tickets_http_requests_total{method="GET",route="/api/tickets/<ticket_id>",status="404"} 1' in lines
+        assert 'tickets_http_requests_total{method="GET",route="unmatched",status="404"} 1' in lines
+        series = 'method="GET",route="/api/tickets/<ticket_id>"'
+        assert f'tickets_http_request_duration_seconds_bucket{{{series},le="+Inf"}} 2' in lines
+        assert f'tickets_http_request_duration_seconds_count{{{series}}} 2' in lines
+        assert '# TYPE tickets_http_request_duration_seconds histogram' in lines
+    
+    def test_storage_operations_timed(self, metrics, sample_ticket_data):
+        """Test that loading and persisting tickets show up as storage timings."""
+        client, scrape = metrics
+        client.post('/api/tickets', json=sample_ticket_data)
+        
+        lines = scrape()
+        
+        for operation in ('load_tickets', 'reload', 'persist', 'save_tickets'):
+            assert f'tickets_storage_duration_seconds_count{{operation="{operation}"}} 1' in lines
+    
+    def test_gauges(self, metrics, sample_ticket_data):
+        """Test the in-flight, ticket count and data file size gauges."""
+        import app as app_module
+        client, scrape = metrics
+        client.post('/api/tickets', json=sample_ticket_data)
+        client.post('/api/tickets', json=sample_ticket_data)
+        
+        lines = scrape()
+        
+        size = os.path.getsize(app_module.DATA_FILE)
+        # At least the scrape itself; the test client tears requests down late
+        in_flight = next(line for line in lines if line.startswith('tickets_http_requests_in_flight '))
+        assert int(in_flight.split()[1]) >= 1
+        assert 'tickets_count 2' in lines
+        assert f'tickets_data_file_bytes{{file="test_tickets.json"}} {size}' in lines
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that observations on a bucket bound count in that bucket."""
+        from app import Histogram, LATENCY_BUCKETS
+        histogram = Histogram()
+        histogram.observe(LATENCY_BUCKETS[0])
+        histogram.observe(0.003)
+        histogram.observe(60)
+        
+        samples = dict(histogram.samples())
+        
+        assert samples[str(LATENCY_BUCKETS[0])] == 1
+        assert samples['0.0025'] == 1
+        assert samples['0.005'] == 2
+        assert samples['10'] == 2
+        assert samples['+Inf'] == 3
+        assert histogram.sum == pytest.approx(60.0035)
+
+
+class TestRequestProfiling(TestConfig):
+    """
+    Tests for the opt-in cProfile request hook and the profile endpoints.
+    """
+    
+    @pytest.fixture
+    def profiles(self, client, tmp_path, monkeypatch):
+        """Token-triggered profiling into a temporary directory."""
+        profile_dir = tmp_path / 'profiles'
+        monkeypatch.setattr('app.PROFILE_DIR', str(profile_dir))
+        monkeypatch.setattr('app.PROFILE_TOKEN', 's3cret')
+        return client, profile_dir
+    
+    def test_disabled_by_default(self, client):
+        """Test that nothing is profiled and the endpoints are hidden by default."""
+        response = client.get('/api/tickets', headers={'X-Profile-Token': ''})
+        
+        assert 'X-Profile-Id' not in response.headers
+        assert client.get('/api/profiles').status_code == 404
+    
+    def test_token_header_profiles_request(self, profiles):
+        """Test that a request with the token is profiled and can be downloaded."""
+        import pstats
+        client, profile_dir = profiles
+        headers = {'X-Profile-Token': 's3cret'}
+        
+        # Act
+        response = client.get('/api/tickets', headers=headers)
+        unprofiled = client.get('/api/tickets')
+        
+        # Assert
+        profile_id = response.headers['X-Profile-Id']
+        assert '-GET-api_tickets-' in profile_id
+        assert 'X-Profile-Id' not in unprofiled.headers
+        listed = client.get('/api/profiles', headers=headers).get_json()
+        assert [p['id'] for p in listed] == [profile_id]
+        download = client.get(f'/api/profiles/{profile_id}', headers=headers)
+        assert download.status_code == 200
+        assert download.data == (profile_dir / profile_id).read_bytes()
+        stats = pstats.Stats(str(profile_dir / profile_id))
+        assert any(func[2] == 'get_tickets' for func in stats.stats)
+        report = client.get(f'/api/profiles/{profile_id}?format=text&limit=5', headers=headers)
+        assert 'cumulative' in report.get_data(as_text=True)
+    
+    def test_endpoints_require_token(self, profiles):
+        """Test that profiles cannot be listed or fetched without the token."""
+        client, _ = profiles
+        
+        assert client.get('/api/profiles').status_code == 403
+        assert client.get('/api/profiles', headers={'X-Profile-Token': 'wrong'}).status_code == 403
+        assert client.get('/api/profiles', headers={'X-Profile-Token': 'sécret'}).status_code == 403
+        assert client.get('/api/tickets', headers={'X-Profile-Token': 'sécret'}).status_code == 200
+        assert client.get('/api/profiles/x.prof').status_code == 403
+    
+    def test_unknown_profile_not_found(self, profiles):
+        """Test that only files listed in the profile directory can be fetched."""
+        client, _ = profiles
+        headers = {'X-Profile-Token': 's3cret'}
+        
+        assert client.get('/api/profiles/missing.prof', headers=headers).status_code == 404
+        assert client.get('/api/profiles/..%2Ftest_tickets.json', headers=headers).status_code == 404
+        profile_id = client.get('/', headers=headers).headers['X-Profile-Id']
+        bad_limit = client.get(f'/api/profiles/{profile_id}?format=text&limit=x', headers=headers)
+        assert bad_limit.status_code == 400
+    
+    def test_sample_rate_with_bounded_directory(self, profiles, monkeypatch):
+        """Test sampling every request while keeping only the newest profiles."""
+        client, profile_dir = profiles
+        monkeypatch.setattr('app.PROFILE_SAMPLE_RATE', 1.0)
+        monkeypatch.setattr('app.PROFILE_MAX_FILES', 2)
+        
+        # Act
+        ids = [client.get('/api/tickets/stats').headers['X-Profile-Id'] for _ in range(4)]
+        
+        # Assert
+        assert sorted(os.listdir(profile_dir)) == sorted(ids)[-2:]
+    
+    def test_endpoints_hidden_without_token(self, client, tmp_path, monkeypatch):
+        """Test that sampling alone saves profiles but does not serve them."""
+        profile_dir = tmp_path / 'profiles'
+        monkeypatch.setattr('app.PROFILE_DIR', str(profile_dir))
+        monkeypatch.setattr('app.PROFILE_SAMPLE_RATE', 1.0)
+        
+        # Act
+        profile_id = client.get('/api/tickets').headers['X-Profile-Id']
+        
+        # Assert
+        assert (profile_dir / profile_id).exists()
+        assert client.get('/api/profiles').status_code == 404
+        assert client.get(f'/api/profiles/{profile_id}').status_code == 404
+    
+    def test_one_profile_at_a_time(self, profiles):
+        """Test that a request is not profiled while another one is."""
+        import app as app_module
+        client, _ = profiles
+        
+        with app_module._profile_lock:
+            response = client.get('/api/tickets', headers={'X-Profile-Token': 's3cret'})
+        
+        assert 'X-Profile-Id' not in response.headers
+        assert app_module._profile_lock.acquire(blocking=False)
+        app_module._profile_lock.release()
+
+
+class TestBenchmarkScript(TestConfig):
+    """
+    Smoke tests for bench_app.py, so the benchmarks keep working as the app changes.
+    """
+    
+    def test_benchmarks_run_against_seeded_store(self, client):
+        """Test every benchmark on a small seeded store, leaving the app configuration alone."""
+        import app as app_module
+        import bench_app
+        data_file = app_module.DATA_FILE
+        
+        results = bench_app.run([30], min_runs=2, min_time=0, log=lambda line: None)
+        
+        assert set(results) == {'30'}
+        assert {'load_tickets', 'save_tickets', 'list', 'get', 'create', 'update', 'delete'} <= set(results['30'])
+        summary = results['30']['get']
+        assert summary['runs'] >= 2
+        assert 0 < summary['p50_ms'] <= summary['p95_ms'] <= summary['p99_ms']
+        assert app_module.DATA_FILE == data_file
+    
+    def test_compare_flags_regressions_beyond_threshold(self):
+        """Test that only growth beyond the relative threshold and the noise floor counts."""
+        import bench_app
+        baseline = {'1000': {'list': {'p50_ms': 10.0, 'peak_kb': 1000.0},
+                             'get': {'p50_ms': 0.2, 'peak_kb': 8.0}}}
+        results = {'1000': {'list': {'p50_ms': 13.0, 'peak_kb': 1100.0},
+                            'get': {'p50_ms': 0.28, 'peak_kb': 12.0},
+                            'stats': {'p50_ms': 5.0, 'peak_kb': 5.0}}}
+        
+        regressions = bench_app.compare(results, baseline, threshold=0.25, mem_threshold=0.25)
+        
+        assert regressions == ['1000 list: p50_ms 10.0 -> 13.0 (+30%)']
+        assert bench_app.main(['--sizes', '20', '--only', 'stats', '--min-runs', '1', '--min-time', '0']) == 0
+
+
+class TestLoadGenerator(TestConfig):
+    """
+    Tests for loadtest/loadgen.py against a live local server.
+    """
+    
+    @pytest.fixture
+    def loadgen(self):
+        import runpy
+        return runpy.run_path(os.path.join(os.path.dirname(__file__), '..', 'loadtest', 'loadgen.py'))
+    
+    def test_profiles_and_mix_parsing(self, loadgen):
+        """Test stage, duration and mix parsing and the ramped arrival rate."""
+        stages = loadgen['parse_stages']('10s:20,1m:200,0:50')
+        
+        assert stages == [(10.0, 20.0), (60.0, 200.0), (0.0, 50.0)]
+        assert loadgen['rate_at'](stages, 5) == 10.0
+        assert loadgen['rate_at'](stages, 40) == 110.0
+        assert loadgen['rate_at'](stages, 70) is None
+        assert loadgen['parse_mix']('get=80,delete=20') == {'get': 80.0, 'delete': 20.0}
+        with pytest.raises(ValueError):
+            loadgen['parse_mix']('browse=1')
+        with pytest.raises(ValueError):
+            loadgen['parse_stages']('10s')
+    
+    def test_mixed_workload_report(self, client_with_tickets, loadgen, tmp_path):
+        """Test a short open-loop run with every operation against a threaded server."""
+        import threading
+        from werkzeug.serving import make_server
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        output = tmp_path / 'report.json'
+        
+        try:
+            # Act
+            exit_code = loadgen['main']([
+                '--url', f'http://127.0.0.1:{server.server_port}', '--stages', '0s:60,1s:60',
+                '--mix', 'list=1,get=1,search=1,create=2,update=1,delete=1',
+                '--connections', '4', '--seed', '7', '--output', str(output)])
+        finally:
+            server.shutdown()
+            thread.join()
+        
+        # Assert
+        report = json.loads(output.read_text())
+        assert exit_code == 0
+        assert report['requests'] > 20
+        assert report['errors'] == 0
+        assert set(report['operations']) == {'list', 'get', 'search', 'create', 'update', 'delete'}
+        assert report['latency_ms']['p50'] <= report['latency_ms']['p99'] <= report['latency_ms']['max']
+        assert [stage['target_rps'] for stage in report['stages']] == [60.0]
+    
+    def test_idle_connections_closed_by_server(self, loadgen, tmp_path):
+        """Test that connections the server closed while idle are not counted as errors."""
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        
+        class KeepAliveHandler(BaseHTTPRequestHandler):
+            # Keeps connections open like gunicorn, with a keep-alive timeout
+            # shorter than most gaps between requests
+            protocol_version = 'HTTP/1.1'
+            timeout = 0.05
+            
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'[]')
+            
+            def log_message(self, *args):
+                pass
+        
+        server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        output = tmp_path / 'report.json'
+        
+        try:
+            # Act
+            loadgen['main']([
+                '--url', f'http://127.0.0.1:{server.server_port}', '--stages', '0s:10,2s:10',
+                '--mix', 'list=1', '--connections', '8', '--seed', '3', '--output', str(output)])
+        finally:
+            server.shutdown()
+            thread.join()
+        
+        # Assert
+        report = json.loads(output.read_text())
+        assert report['requests'] > 5
+        assert report['errors'] == 0, report['error_types']
+
+
+class TestHealthEndpoints(TestConfig):
+    """
+    Tests for the liveness and readiness endpoints.
+    """
+    
+    def test_healthz_is_cheap_and_ok(self, client, monkeypatch):
+        """Test that liveness does not need the store."""
+        monkeypatch.setattr('app._store', None)
+        monkeypatch.setattr('app.get_store', lambda: pytest.fail('loaded the store'))
+        
+        response = client.get('/healthz')
+        
+        assert response.status_code == 200
+        assert response.get_json() == {'status': 'ok'}
+    
+    def test_readyz_reports_store_and_writer(self, client_with_tickets):
+        """Test the readiness signals once tickets have been written."""
+        client, tickets = client_with_tickets
+        
+        # Act
+        response = client.get('/readyz')
+        
+        # Assert
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['status'] == 'ready'
+        assert (data['store'], data['tickets']) == ('loaded', len(tickets))
+        assert data['writer']['queue_depth'] == 0
+        assert data['writer']['last_persist'] is not None
+        assert data['writer']['last_persist_error'] is None
+        assert data['requests']['in_flight'] >= 1
+    
+    def test_readyz_before_store_loaded(self, client, monkeypatch):
+        """Test that a worker without a loaded store is not ready."""
+        monkeypatch.setattr('app._store', None)
+        
+        response = client.get('/readyz')
+        
+        assert response.status_code == 503
+        assert response.get_json()['problems'] == ['store not_loaded']
+    
+    def test_stalled_writer_fails_both_probes(self, client, sample_ticket_data, monkeypatch):
+        """Test that a write stuck behind a lock is reported as a stall."""
+        import threading
+        import time
+        from app import Ticket, new_ticket_id
+        store = get_store()
+        assert store.group_commit
+        monkeypatch.setattr('app.HEALTH_STALL_SECONDS', 0.05)
+        ticket = Ticket.from_dict({**sample_ticket_data, 'id': new_ticket_id(), 'status': 'todo'})
+        writer = threading.Thread(target=store.add, args=(ticket,))
+        
+        # Act
+        with store._lock:
+            writer.start()
+            while store.health()['commit_running_s'] <= 0.05:
+                time.sleep(0.01)
+            live = client.get('/healthz')
+            ready = client.get('/readyz')
+        writer.join()
+        recovered = client.get('/healthz')
+        
+        # Assert
+        assert live.status_code == 503
+        assert live.get_json()['problems'][0].startswith('writer stalled')
+        assert ready.status_code == 503
+        assert recovered.status_code == 200
+        assert len(store) == 1
+    
+    def test_stuck_request_fails_liveness(self, client, monkeypatch):
+        """Test that a request running past the threshold is reported."""
+        import time
+        monkeypatch.setattr('app._active_requests', {-1: time.perf_counter() - 60})
+        
+        response = client.get('/healthz')
+        
+        assert response.status_code == 503
+        assert response.get_json()['problems'] == ['request running for 60s']
+    
+    def test_failed_persist_makes_worker_unready(self, client, sample_ticket_data, monkeypatch):
+        """Test that readiness fails until a write succeeds again."""
+        store = get_store()
+        write = store.backend.write
+        
+        def failing_write(changes, tickets):
+            raise OSError('disk full')
+        
+        monkeypatch.setattr(store.backend, 'write', failing_write)
+        with pytest.raises(OSError):
+            client.post('/api/tickets', json=sample_ticket_data)
+        
+        # Act
+        failing = client.get('/readyz')
+        monkeypatch.setattr(store.backend, 'write', write)
+        client.post('/api/tickets', json=sample_ticket_data)
+        recovered = client.get('/readyz')
+        
+        # Assert
+        assert failing.status_code == 503
+        assert failing.get_json()['problems'] == ['last persist failed']
+        assert failing.get_json()['writer']['last_persist_error']['error'] == 'OSError: disk full'
+        assert recovered.status_code == 200
+        assert client.get('/healthz').status_code == 200
+    
+    def test_old_persist_failure_expires(self, client, monkeypatch):
+        """Test that a failed persist stops failing readiness after the window."""
+        import time
+        store = get_store()
+        monkeypatch.setattr('app.HEALTH_PERSIST_ERROR_SECONDS', 60)
+        monkeypatch.setattr(store, 'last_persist_error', (time.time() - 61, 'OSError: disk full'))
+        
+        # Act
+        response = client.get('/readyz')
+        
+        # Assert
+        assert response.status_code == 200
+        assert response.get_json()['writer']['last_persist_error']['error'] == 'OSError: disk full'
+
+
+class TestProductionServer(TestConfig):
+    """
+    Tests for the gunicorn configuration and worker lifecycle hooks.
+    """
+    
+    @pytest.fixture
+    def config(self, monkeypatch):
+        import runpy
+        monkeypatch.setenv('WEB_CONCURRENCY', '3')
+        monkeypatch.setenv('GUNICORN_THREADS', '6')
+        monkeypatch.delenv('TICKETS_SSE_MAX_SUBSCRIBERS', raising=False)
+        return runpy.run_path(os.path.join(os.path.dirname(__file__), 'gunicorn.conf.py'))
+    
+    def test_settings_come_from_environment(self, config):
+        """Test worker, thread and stream limits."""
+        assert config['worker_class'] == 'gthread'
+        assert (config['workers'], config['threads']) == (3, 6)
+        assert os.environ['TICKETS_SSE_MAX_SUBSCRIBERS'] == '3'
+        assert config['keepalive'] > 0 and config['graceful_timeout'] > 0
+    
+    def test_worker_hooks_load_store_and_shut_down(self, client, config, monkeypatch):
+        """Test that workers preload the store, end streams on SIGTERM and close the store on exit."""
+        import app as app_module
+        import signal
+        import threading
+        handlers = {}
+        exits = []
+        monkeypatch.setattr('signal.signal', lambda sig, handler: handlers.setdefault(sig, handler))
+        monkeypatch.setattr('app._sse_ending', threading.Event())
+        
+        class Worker:
+            def handle_exit(self, sig, frame):
+                exits.append(sig)
+        
+        # Act
+        config['post_worker_init'](Worker())
+        loaded = app_module._store
+        handlers[signal.SIGTERM](signal.SIGTERM, None)
+        config['worker_exit'](None, Worker())
+        
+        # Assert
+        assert loaded is not None
+        assert app_module._sse_ending.is_set()
+        assert exits == [signal.SIGTERM]
+        assert app_module._store is None
+
+
+def _create_tickets_in_worker(data_file, journal, count):
+    """Create tickets from a separate process sharing the same data file."""
+    import app as app_module
+    store = app_module.TicketStore(data_file, journal=journal)
+    store.load()
+    for i in range(count):
+        store.add({'id': f'{os.getpid()}-{i}', 'title': f'T{i}', 'description': 'd',
+                   'due_date': '2030-01-01', 'status': 'todo'})
+    store.close()
+
+
+class TestCrossProcessStorage(TestConfig):
+    """
+    Tests for multi-worker safety: file locking, atomic writes and
+    change detection between stores sharing a data file.
+    """
+    
+    @pytest.fixture
+    def data_file(self, tmp_path):
+        path = tmp_path / "shared.json"
+        with open(path, 'w') as f:
+            json.dump([], f)
+        return str(path)
+    
+    def test_backend_must_implement_load_and_write(self):
+        """
+        Test that a storage backend missing load() or write() cannot be created.
+        """
+        import app as app_module
+        
+        class PartialBackend(app_module.StorageBackend):
+            def load(self):
+                return []
+        
+        # Act / Assert
+        with pytest.raises(TypeError, match='write'):
+            PartialBackend()
+    
+    @pytest.mark.parametrize('journal', [False, True])
+    def test_other_store_sees_changes(self, data_file, monkeypatch, journal):
+        """
+        Test that a store picks up tickets written by another store.
+        """
+        monkeypatch.setattr('app.DATA_FILE', data_file)
+        worker_a = TicketStore(data_file, journal=journal)
+        worker_b = TicketStore(data_file, journal=journal)
+        worker_a.load()
+        worker_b.load()
+        
+        # Act
+        worker_a.add(self._ticket('t1'))
+        
+        # Assert
+        assert worker_b.get('t1')['id'] == 't1'
+        worker_a.close()
+        worker_b.close()
+    
+    @pytest.mark.parametrize('journal', [False, True])
+    def test_interleaved_updates_are_not_lost(self, data_file, monkeypatch, journal):
+        """
+        Test that read-modify-write in one store builds on another store's write.
+        """
+        monkeypatch.setattr('app.DATA_FILE', data_file)
+        worker_a = TicketStore(data_file, journal=journal)
+        worker_b = TicketStore(data_file, journal=journal)
+        worker_a.load()
+        worker_a.add(self._ticket('t1'))
+        worker_b.load()
+        
+        # Act: Both workers update different fields of the same ticket
+        worker_a.update('t1', {'status': 'review'})
+        worker_b.update('t1', {'title': 'Renamed'})
+        
+        # Assert
+        worker_a.refresh()
+        assert worker_a.get('t1')['status'] == 'review'
+        assert worker_a.get('t1')['title'] == 'Renamed'
+        worker_a.close()
+        worker_b.close()
+    
+    def test_unchanged_file_is_not_reparsed(self, data_file, monkeypatch):
+        """
+        Test that reads only re-parse the data file after another writer changed it.
+        """
+        import app as app_module
+        monkeypatch.setattr('app.DATA_FILE', data_file)
+        worker_a = TicketStore(data_file)
+        worker_b = TicketStore(data_file)
+        worker_a.load()
+        worker_b.load()
+        
+        calls = []
+        real_load = app_module.load_tickets
+        monkeypatch.setattr('app.load_tickets', lambda path=None: calls.append(1) or real_load(path))
+        
+        # Act / Assert: Own writes and repeated reads cause no reload
+        worker_b.add(self._ticket('own'))
+        worker_b.all()
+        worker_b.get('own')
+        assert calls == []
+        
+        # Another worker's write causes exactly one reload
+        worker_a.add(self._ticket('other'))
+        calls.clear()
+        assert worker_b.get('other') is not None
+        worker_b.all()
+        assert len(calls) == 1
+    
+    def test_journal_growth_replays_only_the_tail(self, data_file, monkeypatch):
+        """
+        Test that a grown journal is applied incrementally without a full reload.
+        """
+        monkeypatch.setattr('app.DATA_FILE', data_file)
+        worker_a = TicketStore(data_file, journal=True)
+        worker_b = TicketStore(data_file, journal=True)
+        worker_a.load()
+        worker_b.load()
+        monkeypatch.setattr('app.load_tickets', lambda path=None: pytest.fail('full reload'))
+        
+        # Act
+        worker_a.add(self._ticket('t1'))
+        worker_a.update('t1', {'status': 'completed'})
+        
+        # Assert
+        assert worker_b.get('t1')['status'] == 'completed'
+        worker_a.close()
+        worker_b.close()
+    
+    def test_compaction_by_other_worker_forces_reload(self, data_file, monkeypatch):
+        """
+        Test that a store stays consistent after another worker compacted the journal.
+        """
+        monkeypatch.setattr('app.DATA_FILE', data_file)
+        worker_a = TicketStore(data_file, journal=True)
+        worker_b = TicketStore(data_file, journal=True)
+        worker_a.load()
+        worker_b.load()
+        worker_a.add(self._ticket('t1'))
+        worker_b.add(self._ticket('t2'))
+        
+        # Act
+        assert worker_a.compact() is True
+        worker_b.add(self._ticket('t3'))
+        
+        # Assert
+        worker_a.refresh()
+        assert [t['id'] for t in worker_a.all()] == ['t1', 't2', 't3']
+        assert [t['id'] for t in worker_b.all()] == ['t1', 't2', 't3']
+        assert worker_b.compact() is True
+        assert [t['id'] for t in load_tickets()] == ['t1', 't2', 't3']
+        worker_a.close()
+        worker_b.close()
+    
+    def test_save_tickets_replaces_file_atomically(self, data_file, monkeypatch):
+        """
+        Test that save_tickets() swaps in a new file rather than writing in place.
+        """
+        monkeypatch.setattr('app.DATA_FILE', data_file)
+        before = os.stat(data_file).st_ino
+        
+        # Act
+        save_tickets([self._ticket('t1')])
+        
+        # Assert
+        assert os.stat(data_file).st_ino != before
+        assert [t['id'] for t in load_tickets()] == ['t1']
+        assert os.listdir(os.path.dirname(data_file)) == ['shared.json']
+    
+    @pytest.mark.parametrize('journal', [False, True])
+    def test_concurrent_processes_do_not_lose_writes(self, data_file, monkeypatch, journal):
+        """
+        Test that several processes creating tickets concurrently keep every ticket.
+        """
+        import multiprocessing
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            pytest.skip('requires fork')
+        monkeypatch.setattr('app.DATA_FILE', data_file)
+        context = multiprocessing.get_context('fork')
+        
+        # Act
+        workers = [context.Process(target=_create_tickets_in_worker, args=(data_file, journal, 20))
+                   for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+        
+        # Assert
+        assert all(worker.exitcode == 0 for worker in workers)
+        store = TicketStore(data_file, journal=journal)
+        store.load()
+        assert len(store) == 80
+        store.close()
+
+
+def _create_sqlite_tickets_in_worker(db_file, count):
+    """Create tickets from a separate process sharing the same database."""
+    import app as app_module
+    store = app_module.TicketStore(backend=app_module.SqliteBackend(db_file))
+    store.load()
+    for i in range(count):
+        store.add({'id': f'{os.getpid()}-{i}', 'title': f'T{i}', 'description': 'd',
+                   'due_date': '2030-01-01', 'status': 'todo'})
+    store.close()
+
+
+class TestSqliteStorage(TestConfig):
+    """
+    Tests for the SQLite storage backend selected with TICKETS_STORAGE=sqlite.
+    """
+    
+    @pytest.fixture
+    def db_file(self, tmp_path):
+        return str(tmp_path / "tickets.db")
+    
+    @pytest.fixture
+    def sqlite_client(self, client, db_file, monkeypatch):
+        monkeypatch.setattr('app.STORAGE_BACKEND', 'sqlite')
+        monkeypatch.setattr('app.SQLITE_FILE', db_file)
+        return client
+    
+    def _open(self, db_file, json_path=None):
+        import app as app_module
+        store = TicketStore(backend=app_module.SqliteBackend(db_file, json_path=json_path))
+        store.load()
+        return store
+    
+    def test_api_round_trip_persists_to_database(self, sqlite_client, sample_ticket_data, db_file):
+        """
+        Test that create, update and delete through the API land in the database.
+        """
+        client = sqlite_client
+        
+        # Act
+        first = json.loads(client.post('/api/tickets', data=json.dumps(sample_ticket_data),
+                                       content_type='application/json').data)
+        second = json.loads(client.post('/api/tickets', data=json.dumps({**sample_ticket_data, 'title': 'Two'}),
+                                        content_type='application/json').data)
+        client.put(f"/api/tickets/{first['id']}", data=json.dumps({'status': 'review'}),
+                   content_type='application/json')
+        client.delete(f"/api/tickets/{second['id']}")
+        
+        # Assert
+        store = self._open(db_file)
+        assert [(t['id'], t['status']) for t in store.all()] == [(first['id'], 'review')]
+        assert load_tickets() == []
+        store.close()
+    
+    def test_schema_uses_wal_and_indexes(self, db_file):
+        """
+        Test that the database runs in WAL mode with indexes on the filtered columns.
+        """
+        import sqlite3
+        self._open(db_file).close()
+        
+        # Act
+        conn = sqlite3.connect(db_file)
+        journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        indexed = {conn.execute(f"PRAGMA index_info('{name}')").fetchone()[2]
+                   for _, name, *_ in conn.execute("PRAGMA index_list('tickets')")}
+        conn.close()
+        
+        # Assert
+        assert journal_mode == 'wal'
+        assert {'id', 'status', 'due_date'} <= indexed
+    
+    def test_new_database_is_seeded_from_json_once(self, tmp_path, db_file, monkeypatch):
+        """
+        Test migration: an empty database imports tickets_data.json, later opens do not.
+        """
+        json_file = str(tmp_path / "tickets_data.json")
+        monkeypatch.setattr('app.DATA_FILE', json_file)
+        save_tickets([self._ticket('t1'), self._ticket('t2', status='completed')])
+        
+        # Act
+        store = self._open(db_file, json_path=json_file)
+        imported = [(t['id'], t['status']) for t in store.all()]
+        store.delete('t1')
+        store.close()
+        reopened = self._open(db_file, json_path=json_file)
+        
+        # Assert
+        assert imported == [('t1', 'todo'), ('t2', 'completed')]
+        assert [t['id'] for t in reopened.all()] == ['t2']
+        reopened.close()
+    
+    def test_updates_keep_insertion_order(self, db_file):
+        """
+        Test that updating a ticket does not move it to the end after a reload.
+        """
+        store = self._open(db_file)
+        for ticket_id in ('t1', 't2', 't3'):
+            store.add(self._ticket(ticket_id))
+        
+        # Act
+        store.update('t1', {'status': 'completed'})
+        store.close()
+        
+        # Assert
+        assert [t['id'] for t in self._open(db_file).all()] == ['t1', 't2', 't3']
+    
+    def test_other_store_changes_are_applied_incrementally(self, db_file, monkeypatch):
+        """
+        Test that a store picks up another store's commits without reloading everything.
+        """
+        import app as app_module
+        worker_a = self._open(db_file)
+        worker_b = self._open(db_file)
+        worker_a.add(self._ticket('t1'))
+        worker_a.add(self._ticket('t2'))
+        worker_b.refresh()
+        monkeypatch.setattr(app_module.SqliteBackend, 'load', lambda self: pytest.fail('full reload'))
+        
+        # Act
+        worker_a.update('t1', {'status': 'completed'})
+        worker_a.delete('t2')
+        worker_a.add(self._ticket('t3'))
+        
+        # Assert
+        assert worker_b.get('t1')['status'] == 'completed'
+        assert [t['id'] for t in worker_b.all()] == ['t1', 't3']
+        assert worker_b.refresh() is False
+        worker_a.close()
+        worker_b.close()
+    
+    def test_store_behind_pruned_tombstones_reloads(self, db_file, monkeypatch):
+        """
+        Test that a store that missed pruned deletions falls back to a full reload.
+        """
+        monkeypatch.setattr('app.SQLITE_TOMBSTONE_REVISIONS', 1)
+        worker_a = self._open(db_file)
+        worker_b = self._open(db_file)
+        worker_a.add(self._ticket('gone'))
+        worker_b.refresh()
+        
+        # Act
+        worker_a.delete('gone')
+        for i in range(1000):
+            worker_a.add(self._ticket(f't{i}'))
+        
+        # Assert
+        assert worker_b.get('gone') is None
+        assert len(worker_b) == 1000
+        worker_a.close()
+        worker_b.close()
+    
+    def test_failed_write_leaves_store_unchanged(self, db_file, monkeypatch):
+        """
+        Test that a write that fails to commit is rolled back and not applied.
+        """
+        import app as app_module
+        import sqlite3
+        store = self._open(db_file)
+        store.add(self._ticket('t1'))
+        
+        def fail(self, changes, rev):
+            raise sqlite3.OperationalError('disk I/O error')
+        
+        monkeypatch.setattr(app_module.SqliteBackend, '_store_changes', fail)
+        
+        # Act
+        with pytest.raises(sqlite3.OperationalError):
+            store.update('t1', {'status': 'completed'})
+        
+        # Assert
+        assert store.get('t1')['status'] == 'todo'
+        monkeypatch.undo()
+        store.add(self._ticket('t2'))
+        assert [t['id'] for t in self._open(db_file).all()] == ['t1', 't2']
+        store.close()
+    
+    def test_unknown_backend_rejected(self, client, monkeypatch):
+        """Test that a misspelled TICKETS_STORAGE fails loudly."""
+        import app as app_module
+        monkeypatch.setattr('app.STORAGE_BACKEND', 'postgres')
+        
+        with pytest.raises(ValueError):
+            app_module.create_backend()
+    
+    def test_concurrent_processes_do_not_lose_writes(self, db_file):
+        """
+        Test that several processes writing to one database keep every ticket.
+        """
+        import multiprocessing
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            pytest.skip('requires fork')
+        self._open(db_file).close()
+        context = multiprocessing.get_context('fork')
+        
+        # Act
+        workers = [context.Process(target=_create_sqlite_tickets_in_worker, args=(db_file, 20))
+                   for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+        
+        # Assert
+        assert all(worker.exitcode == 0 for worker in workers)
+        assert len(self._open(db_file)) == 80
 
 
 if __name__ == '__main__':